@@ -10,6 +10,7 @@ from fastapi import APIRouter, HTTPException
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 from typing import Optional, Dict, Any, List
+import asyncio
 import httpx
 import logging
 import os
@@ -60,7 +61,7 @@ ENABLE_TEXT_TO_SQL = os.getenv("SQL_ENABLE_TEXT_TO_SQL", "false").lower() == "tr
 # Text-to-SQL 모드용 import (조건부)
 if ENABLE_TEXT_TO_SQL:
     from app.services.text_to_sql import get_text_to_sql_service, extract_where_conditions
-    from app.services.download_service import generate_csv, generate_excel
+    from app.services.download_service import generate_csv, generate_excel, generate_ndjson
 
 logger = logging.getLogger(__name__)
 logger.info(f"Text-to-SQL mode: {'ENABLED' if ENABLE_TEXT_TO_SQL else 'DISABLED'}")
@@ -115,7 +116,7 @@ class ChatResponse(BaseModel):
 class DownloadRequest(BaseModel):
     """다운로드 요청"""
     sql: str
-    format: str = "csv"  # csv 또는 excel
+    format: str = "csv"  # csv, ndjson 또는 excel
 
 
 # ============================================
@@ -1250,7 +1251,7 @@ async def download_query_result(request: DownloadRequest):
     대용량 쿼리 결과 다운로드
 
     - SQL 재검증 후 실행 (LIMIT 없이)
-    - Streaming 응답으로 메모리 효율화
+    - Streaming 응답으로 메모리 효율화 (csv, ndjson 행 단위 스트리밍 / excel)
     """
     if not ENABLE_TEXT_TO_SQL:
         raise HTTPException(400, "Text-to-SQL mode is not enabled")
@@ -1279,7 +1280,8 @@ async def download_query_result(request: DownloadRequest):
     # format에 따라 분기 처리
     if request.format == "excel":
         try:
-            excel_data = generate_excel(text_to_sql, unlimited_sql)
+            # 전체 조회 + 엑셀 생성은 동기 DB/CPU 작업이므로 이벤트 루프를 막지 않도록 스레드에서 실행
+            excel_data = await asyncio.to_thread(generate_excel, text_to_sql, unlimited_sql)
             filename = f"query_result_{timestamp}.xlsx"
 
             from fastapi.responses import Response
@@ -1295,6 +1297,17 @@ async def download_query_result(request: DownloadRequest):
             logger.error(f"Excel download failed: {e}")
             raise HTTPException(500, f"Excel generation failed: {str(e)}")
 
+    # NDJSON 응답 (행 단위 스트리밍, 클라이언트에서 도착하는 대로 처리)
+    if request.format == "ndjson":
+        return StreamingResponse(
+            generate_ndjson(text_to_sql, unlimited_sql),
+            media_type="application/x-ndjson",
+            headers={
+                "Content-Disposition": f"attachment; filename=query_result_{timestamp}.ndjson",
+                "X-Content-Type-Options": "nosniff"
+            }
+        )
+
     # CSV 응답 (기본)
     filename = f"query_result_{timestamp}.csv"
     return StreamingResponse(
@@ -1576,10 +1589,11 @@ def build_sql_history(conversation_history: Optional[List[ChatMessageItem]]) ->
             "role": msg.role,
             "content": msg.content
         }
+        mode = msg.queryPlan.get("mode") if msg.queryPlan else None
 
         # assistant 메시지에 SQL 정보가 있으면 포함
         if msg.role == "assistant" and msg.queryPlan:
-            if msg.queryPlan.get("mode") == "text_to_sql" and msg.queryPlan.get("sql"):
+            if mode == "text_to_sql" and msg.queryPlan.get("sql"):
                 sql = msg.queryPlan.get("sql")
                 entry["sql"] = sql
 
@@ -1588,9 +1602,9 @@ def build_sql_history(conversation_history: Optional[List[ChatMessageItem]]) ->
                 if ENABLE_TEXT_TO_SQL:
                     where_conditions = extract_where_conditions(sql)
                     if where_conditions:
-                        entry["whereConditions"] = where_conditions
+                        entry["whereConditions"] = list(where_conditions)
 
-            elif msg.queryPlan.get("mode") == "daily_check_template":
+            elif mode == "daily_check_template":
                 # 일일점검 결과를 컨텍스트로 포함 (꼬리 질문 시 LLM이 참조)
                 context_for_followup = {}
                 if msg.queryResult:
@@ -1625,7 +1639,7 @@ def build_sql_history(conversation_history: Optional[List[ChatMessageItem]]) ->
             metadata = msg.queryResult.get("metadata", {})
 
             # daily_check_template의 경우 queryCount 사용
-            if msg.queryPlan and msg.queryPlan.get("mode") == "daily_check_template":
+            if mode == "daily_check_template":
                 entry["rowCount"] = metadata.get("queryCount", 0)
             else:
                 # totalRows 또는 rowsReturned 우선순위로 확인
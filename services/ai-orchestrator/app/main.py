@@ -1,5 +1,8 @@
 import os
+import asyncio
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
@@ -17,10 +20,52 @@ logging.basicConfig(
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 )
 
+# Text-to-SQL LLM 워밍업 태스크 (GC 방지용 참조 유지)
+_warmup_tasks = set()
+
+
+def _start_text_to_sql_warmup():
+    """Text-to-SQL LLM 클라이언트를 기동 시점에 초기화 (첫 요청 지연 제거)"""
+    if not chat.ENABLE_TEXT_TO_SQL:
+        return
+    if os.getenv("LLM_WARMUP", "true").lower() != "true":
+        return
+
+    # 기동을 막지 않도록 백그라운드에서 실행
+    task = asyncio.create_task(chat.get_text_to_sql_service().warmup())
+    _warmup_tasks.add(task)
+    task.add_done_callback(_warmup_tasks.discard)
+
+
+def _configure_default_executor():
+    """
+    asyncio.to_thread용 기본 스레드 풀 크기 설정
+
+    SQL 실행, RAG 임베딩 등 동기 작업이 모두 기본 스레드 풀에서 실행됩니다.
+    기본값(min(32, CPU 수 + 4))은 CPU가 적은 컨테이너에서 DB 커넥션 풀(SQL_POOL_MAX_SIZE)보다
+    작아져 동시 쿼리 수를 제한하므로 명시적으로 지정합니다.
+    """
+    max_workers = int(os.getenv("THREAD_POOL_MAX_WORKERS", "32"))
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ai-orchestrator")
+    )
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    _configure_default_executor()
+    _start_text_to_sql_warmup()
+    yield
+    if chat.ENABLE_TEXT_TO_SQL:
+        from app.services.text_to_sql import close_text_to_sql_service
+        close_text_to_sql_service()
+
+
 app = FastAPI(
     title="AI Orchestrator",
     description="ChatOps AI Orchestrator - Step 8: RAG Document Management API",
-    version="0.8.0"
+    version="0.8.0",
+    lifespan=lifespan
 )
 
 # CORS middleware
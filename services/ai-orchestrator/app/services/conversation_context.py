@@ -21,6 +21,14 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+# 이전 결과 행에서 금액으로 인식하는 필드명 (우선순위 순)
+_AMOUNT_FIELDS = ("amount", "totalAmount", "total_amount", "price", "금액")
+
+# 텍스트 응답에서 금액 추출 패턴 (우선순위 순)
+_PAREN_FULL_AMOUNT_RE = re.compile(r'\(\$?([\d,]+)\)')                # "$2.88M ($2,878,000)"
+_ABBREV_AMOUNT_RE = re.compile(r'\$?([\d,]+(?:\.\d+)?)\s*([MK])')     # "$2.88M"
+_SIMPLE_AMOUNT_RE = re.compile(r'\$?([\d,]+(?:\.\d+)?)')              # "$1,234,567"
+
 
 # ============================================
 # 유틸리티 함수
@@ -463,6 +471,9 @@ def extract_previous_results(history: List["ChatMessageItem"]) -> List[Dict[str,
             if msg.queryResult:
                 logger.info(f"[extract_previous_results] msg #{i} has queryResult with keys: {list(msg.queryResult.keys())}")
                 result_info["count"] = msg.queryResult.get("totalCount", 0)
+                # data is an object with 'rows' property according to query-result.schema.json
+                data_obj = msg.queryResult.get("data", {})
+                rows = data_obj.get("rows", []) if isinstance(data_obj, dict) else []
                 if msg.queryPlan:
                     result_info["entity"] = msg.queryPlan.get("entity", "unknown")
 
@@ -481,8 +492,6 @@ def extract_previous_results(history: List["ChatMessageItem"]) -> List[Dict[str,
                     logger.info(f"[extract_previous_results] msg #{i} is aggregation with GROUP BY: {group_by_columns}")
 
                     # 결과 데이터에서 GROUP BY 값들 추출 (꼬리 질문 지원)
-                    data_obj = msg.queryResult.get("data", {})
-                    rows = data_obj.get("rows", []) if isinstance(data_obj, dict) else []
                     if rows and group_by_columns:
                         # 첫 번째 그룹 컬럼의 값들 추출
                         group_col = group_by_columns[0]
@@ -494,9 +503,6 @@ def extract_previous_results(history: List["ChatMessageItem"]) -> List[Dict[str,
                         logger.info(f"[extract_previous_results] msg #{i} GROUP BY values: {group_values}")
 
                 # 실제 데이터에서 금액 합계 추출
-                data_obj = msg.queryResult.get("data", {})
-                # data is an object with 'rows' property according to query-result.schema.json
-                rows = data_obj.get("rows", []) if isinstance(data_obj, dict) else []
                 logger.info(f"[extract_previous_results] msg #{i} rows length: {len(rows) if rows else 0}")
 
                 # composite 결과 (rows가 비어있고 context_for_followup이 있는 경우)
@@ -522,7 +528,7 @@ def extract_previous_results(history: List["ChatMessageItem"]) -> List[Dict[str,
                         if isinstance(row, dict):
                             logger.info(f"[extract_previous_results] msg #{i} row #{row_idx} keys: {list(row.keys())}")
                             # amount, totalAmount, 금액 등 다양한 필드명 체크
-                            for field in ["amount", "totalAmount", "total_amount", "price", "금액"]:
+                            for field in _AMOUNT_FIELDS:
                                 if field in row and row[field] is not None:
                                     try:
                                         amounts.append(float(row[field]))
@@ -550,7 +556,7 @@ def extract_previous_results(history: List["ChatMessageItem"]) -> List[Dict[str,
                     # 텍스트에서 금액 추출 (우선순위: 괄호 안 전체 금액 > 축약 금액)
                     if result_info["total_amount"] is None:
                         # 1순위: 괄호 안의 전체 금액 (예: "$2.88M ($2,878,000)" -> 2878000)
-                        full_amount_match = re.search(r'\(\$?([\d,]+)\)', text_content)
+                        full_amount_match = _PAREN_FULL_AMOUNT_RE.search(text_content)
                         if full_amount_match:
                             try:
                                 result_info["total_amount"] = float(full_amount_match.group(1).replace(',', ''))
@@ -560,7 +566,7 @@ def extract_previous_results(history: List["ChatMessageItem"]) -> List[Dict[str,
 
                         # 2순위: M/K 접미사 처리 (예: "$2.88M" -> 2880000)
                         if result_info["total_amount"] is None:
-                            abbrev_match = re.search(r'\$?([\d,]+(?:\.\d+)?)\s*([MK])', text_content)
+                            abbrev_match = _ABBREV_AMOUNT_RE.search(text_content)
                             if abbrev_match:
                                 try:
                                     value = float(abbrev_match.group(1).replace(',', ''))
@@ -576,7 +582,7 @@ def extract_previous_results(history: List["ChatMessageItem"]) -> List[Dict[str,
 
                         # 3순위: 일반 금액 (예: "$1,234,567")
                         if result_info["total_amount"] is None:
-                            simple_match = re.search(r'\$?([\d,]+(?:\.\d+)?)', text_content)
+                            simple_match = _SIMPLE_AMOUNT_RE.search(text_content)
                             if simple_match:
                                 try:
                                     result_info["total_amount"] = float(simple_match.group(1).replace(',', ''))
@@ -1,13 +1,15 @@
 """
 DownloadService: 대용량 쿼리 결과 다운로드
 
-CSV, Excel 형식으로 쿼리 결과를 스트리밍 다운로드 지원
+CSV, NDJSON, Excel 형식으로 쿼리 결과를 스트리밍 다운로드 지원
 """
 
 import io
 import csv
+import json
 import logging
-from typing import Generator, TYPE_CHECKING
+from decimal import Decimal
+from typing import Any, Generator, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from app.services.text_to_sql import TextToSqlService
@@ -34,7 +36,7 @@ def generate_csv(
     import psycopg
 
     try:
-        with text_to_sql._get_readonly_connection() as conn:
+        with text_to_sql._get_download_connection() as conn:
             with conn.cursor() as cur:
                 cur.execute(sql)
 
@@ -75,6 +77,71 @@ def generate_csv(
         yield f"Error: {str(e)}"
 
 
+def _ndjson_default(value: Any) -> Any:
+    """JSON 기본 타입이 아닌 DB 값 변환 (NUMERIC → 문자열, 날짜/시간 → ISO 문자열)"""
+    # float 변환 시 큰 금액/고정밀 NUMERIC이 반올림되므로 CSV와 동일하게 원본 자릿수 유지
+    if isinstance(value, Decimal):
+        return str(value)
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
+try:
+    import orjson
+
+    def _dump_ndjson_line(row: dict) -> bytes:
+        return orjson.dumps(row, default=_ndjson_default) + b"\n"
+except ImportError:
+    def _dump_ndjson_line(row: dict) -> bytes:
+        return (json.dumps(row, ensure_ascii=False, default=_ndjson_default) + "\n").encode("utf-8")
+
+
+def generate_ndjson(
+    text_to_sql: "TextToSqlService",
+    sql: str
+) -> Generator[bytes, None, None]:
+    """NDJSON 스트리밍 생성기
+
+    행을 한 줄에 하나의 JSON 객체로 스트리밍합니다.
+    클라이언트는 전체 결과를 기다리지 않고 도착하는 대로 행을 처리할 수 있습니다.
+    서버 사이드(named) 커서로 배치 단위(1000건)씩 가져오므로
+    전체 결과를 클라이언트 메모리에 올리지 않습니다.
+
+    Args:
+        text_to_sql: TextToSqlService 인스턴스 (DB 연결용)
+        sql: 실행할 SQL 쿼리 (LIMIT/OFFSET 제거된 상태)
+
+    Yields:
+        배치별 NDJSON 바이트 (행마다 개행으로 구분)
+    """
+    import psycopg
+    from psycopg.rows import dict_row
+
+    try:
+        with text_to_sql._get_download_connection() as conn:
+            # named 커서 → DECLARE CURSOR (트랜잭션 내에서 fetchmany마다 서버에서 가져옴)
+            with conn.cursor(name="ndjson_download", row_factory=dict_row) as cur:
+                cur.execute(sql)
+
+                # 데이터 배치 처리 (1000건씩)
+                batch_size = 1000
+                row_count = 0
+                while True:
+                    rows = cur.fetchmany(batch_size)
+                    if not rows:
+                        break
+
+                    yield b"".join(_dump_ndjson_line(row) for row in rows)
+                    row_count += len(rows)
+
+                logger.info(f"NDJSON download completed: {row_count} rows")
+
+    except psycopg.Error as e:
+        logger.error(f"NDJSON download SQL execution failed: {e}")
+        yield _dump_ndjson_line({"error": str(e)})
+
+
 def generate_excel(
     text_to_sql: "TextToSqlService",
     sql: str
@@ -104,7 +171,7 @@ def generate_excel(
     ws.title = "Query Result"
 
     try:
-        with text_to_sql._get_readonly_connection() as conn:
+        with text_to_sql._get_download_connection() as conn:
             with conn.cursor() as cur:
                 cur.execute(sql)
 
@@ -474,7 +474,9 @@ class QueryPlannerService:
         if not previous_results:
             return ""
 
-        results_summary = "\n### 이전 조회 결과:\n"
+        # 결과 건수만큼 += 로 이어붙이지 않고 조각을 모아 한 번에 join
+        parts = ["\n### 이전 조회 결과:\n"]
+        append = parts.append
         latest_amount = None  # 가장 최근 금액 (계산용)
 
         for i, r in enumerate(previous_results):
@@ -485,31 +487,31 @@ class QueryPlannerService:
             data_summary = r.get("data_summary", "")
             sql_summary = r.get("sql_summary")
 
-            results_summary += f"- 결과 #{i+1}: {entity} {count}건"
+            append(f"- 결과 #{i+1}: {entity} {count}건")
 
             # 실제 금액 데이터 포함
             if total_amount:
-                results_summary += f" | **금액 합계: ${total_amount:,.0f}**"
+                append(f" | **금액 합계: ${total_amount:,.0f}**")
                 latest_amount = total_amount  # 가장 최근 금액 저장
 
             if aggregation:
-                results_summary += f" | 집계 결과: {aggregation}"
+                append(f" | 집계 결과: {aggregation}")
 
             if data_summary and not total_amount:
-                results_summary += f" | {data_summary}"
+                append(f" | {data_summary}")
 
             # SQL 로직 요약 포함
             if sql_summary:
-                results_summary += f" | **SQL 로직**: {sql_summary}"
+                append(f" | **SQL 로직**: {sql_summary}")
 
-            results_summary += "\n"
+            append("\n")
 
         # 가장 최근 금액 강조
         if latest_amount:
-            results_summary += f"\n⚠️ **계산에 사용할 금액: ${latest_amount:,.0f}**\n"
-            results_summary += "이 금액을 기준으로 수수료, 나눗셈 등 계산을 수행하세요!\n"
+            append(f"\n⚠️ **계산에 사용할 금액: ${latest_amount:,.0f}**\n")
+            append("이 금액을 기준으로 수수료, 나눗셈 등 계산을 수행하세요!\n")
 
-        return results_summary
+        return "".join(parts)
 
     async def classify_intent(
         self,
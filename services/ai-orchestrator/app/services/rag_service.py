@@ -5,6 +5,7 @@ pgvector를 사용한 벡터 유사도 검색
 
 import os
 import json
+import asyncio
 import logging
 from typing import List, Optional, Dict, Any, Tuple
 from dataclasses import dataclass
@@ -191,7 +192,9 @@ class RAGService:
         if not client:
             raise ValueError("OpenAI client not available")
 
-        response = client.embeddings.create(
+        # 동기 HTTP 호출이므로 이벤트 루프를 막지 않도록 스레드에서 실행
+        response = await asyncio.to_thread(
+            client.embeddings.create,
             model=self.embedding_model,
             input=text
         )
@@ -205,6 +208,19 @@ class RAGService:
         min_similarity: float
     ) -> List[Document]:
         """pgvector를 사용한 벡터 유사도 검색"""
+        # 동기 DB 조회이므로 이벤트 루프를 막지 않도록 스레드에서 실행
+        return await asyncio.to_thread(
+            self._vector_search_sync, query_embedding, k, doc_types, min_similarity
+        )
+
+    def _vector_search_sync(
+        self,
+        query_embedding: List[float],
+        k: int,
+        doc_types: Optional[List[str]],
+        min_similarity: float
+    ) -> List[Document]:
+        """_vector_search의 동기 구현 (스레드에서 실행)"""
         documents = []
 
         try:
@@ -0,0 +1,118 @@
+"""
+SQL 템플릿 매칭 서비스
+
+자주 반복되는 정형 질문("오늘 매출", "mer_001 정산 내역", "최근 10건 실패 결제")을
+정규식 템플릿으로 매칭하여 LLM 호출 없이 SQL을 생성합니다.
+
+- 질문 전체가 템플릿과 일치(fullmatch)할 때만 적용하여 오탐을 방지
+- 생성된 SQL도 SqlValidator 검증을 그대로 거침
+- 매칭 실패 시 None 반환 → 기존 LLM 생성 경로 사용
+"""
+
+import re
+import logging
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================
+# 템플릿 정의
+# ============================================
+
+# 질문 끝의 요청 표현 (예: "보여줘", "조회해줘", "알려줘", "얼마야")
+_REQUEST_SUFFIX = r'(?:\s*(?:보여\s*줘|보여\s*주세요|조회\s*해?\s*줘|조회|알려\s*줘|알려\s*주세요|얼마\s*야?))?'
+
+# 질문 끝 문장부호
+_TRAILING_PUNCTUATION = "?!. "
+
+
+@dataclass(frozen=True)
+class SqlTemplate:
+    """정형 질문 → SQL 템플릿"""
+    name: str
+    pattern: "re.Pattern[str]"
+    build_sql: Callable[["re.Match[str]"], str]
+
+
+def _today_revenue_sql(match: "re.Match[str]") -> str:
+    return (
+        "SELECT SUM(amount) AS total_amount, COUNT(*) AS payment_count "
+        "FROM payments "
+        "WHERE approved_at >= CURRENT_DATE AND approved_at < CURRENT_DATE + 1 "
+        "AND status = 'DONE';"
+    )
+
+
+def _merchant_settlements_sql(match: "re.Match[str]") -> str:
+    return (
+        "SELECT * FROM settlements "
+        f"WHERE merchant_id = '{match.group('merchant_id')}' "
+        "ORDER BY settlement_date DESC;"
+    )
+
+
+def _recent_failed_payments_sql(match: "re.Match[str]") -> str:
+    return (
+        "SELECT * FROM payments "
+        "WHERE status = 'ABORTED' "
+        f"ORDER BY created_at DESC LIMIT {int(match.group('limit'))};"
+    )
+
+
+SQL_TEMPLATES: List[SqlTemplate] = [
+    # "오늘 매출", "금일 총 매출 얼마야"
+    SqlTemplate(
+        name="today_revenue",
+        pattern=re.compile(
+            rf'(?:오늘|금일|당일)\s*(?:총\s*)?매출(?:\s*(?:합계|총액))?(?:은|이|을)?{_REQUEST_SUFFIX}'
+        ),
+        build_sql=_today_revenue_sql,
+    ),
+    # "mer_001 정산 내역", "mer_001 가맹점의 정산 현황 보여줘"
+    SqlTemplate(
+        name="merchant_settlements",
+        pattern=re.compile(
+            rf'(?P<merchant_id>mer_[A-Za-z0-9_]+)\s*(?:가맹점\s*)?(?:의\s*)?정산\s*(?:내역|현황)?{_REQUEST_SUFFIX}'
+        ),
+        build_sql=_merchant_settlements_sql,
+    ),
+    # "최근 10건 실패 결제", "최근 20건의 오류 결제 내역 보여줘"
+    SqlTemplate(
+        name="recent_failed_payments",
+        pattern=re.compile(
+            rf'최근\s*(?P<limit>[1-9]\d{{0,3}})\s*건\s*(?:의\s*)?(?:실패|오류)\s*결제\s*(?:내역|건)?{_REQUEST_SUFFIX}'
+        ),
+        build_sql=_recent_failed_payments_sql,
+    ),
+]
+
+
+# ============================================
+# 매칭
+# ============================================
+
+def match_sql_template(question: str) -> Optional[Tuple[str, str]]:
+    """
+    정형 질문을 템플릿과 매칭하여 SQL 생성
+
+    Args:
+        question: 사용자 질문
+
+    Returns:
+        (템플릿 이름, SQL) 튜플 또는 None (매칭 실패 시)
+    """
+    if not question:
+        return None
+
+    normalized = question.strip().rstrip(_TRAILING_PUNCTUATION)
+
+    for template in SQL_TEMPLATES:
+        match = template.pattern.fullmatch(normalized)
+        if match:
+            sql = template.build_sql(match)
+            logger.info(f"SQL template matched: {template.name}")
+            return template.name, sql
+
+    return None
@@ -10,6 +10,33 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# ============================================
+# 사전 컴파일 정규식 (검증은 생성된 SQL마다 실행됨)
+# ============================================
+
+_WHITESPACE_RE = re.compile(r'\s+')
+_SELECT_START_RE = re.compile(r'^(WITH\s+\w+\s+AS\s*\(.+\)\s*)?SELECT\s', re.IGNORECASE)
+_SINGLE_QUOTED_RE = re.compile(r"'[^']*'")
+_DOUBLE_QUOTED_RE = re.compile(r'"[^"]*"')
+_LIMIT_RE = re.compile(r'\bLIMIT\s+(\d+)', re.IGNORECASE)
+_FROM_TABLE_RE = re.compile(r'\bFROM\s+(\w+)', re.IGNORECASE)
+_JOIN_TABLE_RE = re.compile(r'\bJOIN\s+(\w+)', re.IGNORECASE)
+
+# SQL 인젝션 패턴 (하나라도 매칭되면 차단 → 단일 alternation으로 1회 검사)
+_INJECTION_RE = re.compile(
+    "|".join([
+        r'--',              # 라인 주석
+        r'/\*',             # 블록 주석 시작
+        r'\*/',             # 블록 주석 끝
+        r';\s*--',          # 세미콜론 후 주석
+        r"'\s*OR\s+'",      # OR 인젝션
+        r"'\s*OR\s+\d",     # OR 숫자 인젝션
+        r"1\s*=\s*1",       # 항상 참 조건
+        r"'\s*=\s*'",       # 항상 참 문자열 비교
+    ]),
+    re.IGNORECASE
+)
+
 
 @dataclass
 class ValidationResult:
@@ -172,24 +199,20 @@ class SqlValidator:
     def _normalize_sql(self, sql: str) -> str:
         """SQL 정규화 (앞뒤 공백 제거, 줄바꿈 정리)"""
         # 여러 줄 공백을 단일 공백으로
-        normalized = re.sub(r'\s+', ' ', sql.strip())
+        normalized = _WHITESPACE_RE.sub(' ', sql.strip())
         return normalized
 
     def _is_select_query(self, sql: str) -> bool:
         """SELECT 문으로 시작하는지 확인"""
         # WITH ... SELECT 또는 SELECT로 시작해야 함
-        select_pattern = re.compile(
-            r'^(WITH\s+\w+\s+AS\s*\(.+\)\s*)?SELECT\s',
-            re.IGNORECASE
-        )
-        return bool(select_pattern.match(sql))
+        return bool(_SELECT_START_RE.match(sql))
 
     def _has_multiple_statements(self, sql: str) -> bool:
         """다중 쿼리 여부 확인"""
         # 문자열 리터럴 내의 세미콜론은 무시
         # 간단한 방법: 문자열 리터럴 제거 후 세미콜론 확인
-        no_strings = re.sub(r"'[^']*'", '', sql)
-        no_strings = re.sub(r'"[^"]*"', '', no_strings)
+        no_strings = _SINGLE_QUOTED_RE.sub('', sql)
+        no_strings = _DOUBLE_QUOTED_RE.sub('', no_strings)
 
         # 끝의 세미콜론은 허용
         trimmed = no_strings.rstrip(';').strip()
@@ -199,11 +222,10 @@ class SqlValidator:
         """차단 키워드 검사"""
         found = []
         for pattern in self._blocked_keyword_patterns:
-            if pattern.search(sql):
-                # 매칭된 키워드 추출
-                match = pattern.search(sql)
-                if match:
-                    found.append(match.group())
+            # 매칭된 키워드 추출
+            match = pattern.search(sql)
+            if match:
+                found.append(match.group())
         return found
 
     def _check_blocked_tables(self, sql: str) -> List[str]:
@@ -211,12 +233,9 @@ class SqlValidator:
         found = []
         sql_lower = sql.lower()
         for table in self.BLOCKED_TABLES:
-            # FROM, JOIN 등에서 테이블 접근 확인
-            pattern = re.compile(
-                rf'\b(FROM|JOIN|INTO|UPDATE|TABLE)\s+.*?\b{re.escape(table.lower())}\b',
-                re.IGNORECASE
-            )
-            if pattern.search(sql_lower) or table.lower() in sql_lower:
+            # 테이블명이 SQL 어디에든 등장하면 차단
+            # (FROM/JOIN/INTO 등 절 단위 검사는 이 부분 문자열 검사에 포함되므로 생략)
+            if table.lower() in sql_lower:
                 found.append(table)
         return found
 
@@ -231,38 +250,19 @@ class SqlValidator:
 
     def _has_injection_patterns(self, sql: str) -> bool:
         """SQL 인젝션 패턴 검사"""
-        injection_patterns = [
-            r'--',              # 라인 주석
-            r'/\*',             # 블록 주석 시작
-            r'\*/',             # 블록 주석 끝
-            r';\s*--',          # 세미콜론 후 주석
-            r"'\s*OR\s+'",      # OR 인젝션
-            r"'\s*OR\s+\d",     # OR 숫자 인젝션
-            r"1\s*=\s*1",       # 항상 참 조건
-            r"'\s*=\s*'",       # 항상 참 문자열 비교
-        ]
-
-        for pattern in injection_patterns:
-            if re.search(pattern, sql, re.IGNORECASE):
-                return True
-        return False
+        return bool(_INJECTION_RE.search(sql))
 
     def _apply_limit(self, sql: str) -> str:
         """LIMIT 적용 또는 조정"""
         # 기존 LIMIT 찾기
-        limit_pattern = re.compile(
-            r'\bLIMIT\s+(\d+)',
-            re.IGNORECASE
-        )
-
-        match = limit_pattern.search(sql)
+        match = _LIMIT_RE.search(sql)
 
         if match:
             # 기존 LIMIT 값 확인
             current_limit = int(match.group(1))
             if current_limit > self.max_rows:
                 # max_rows로 제한
-                sql = limit_pattern.sub(f'LIMIT {self.max_rows}', sql)
+                sql = _LIMIT_RE.sub(f'LIMIT {self.max_rows}', sql)
                 logger.info(f"LIMIT adjusted from {current_limit} to {self.max_rows}")
         else:
             # LIMIT 없으면 추가
@@ -286,18 +286,10 @@ class SqlValidator:
         tables = []
 
         # FROM 절 테이블
-        from_pattern = re.compile(
-            r'\bFROM\s+(\w+)',
-            re.IGNORECASE
-        )
-        tables.extend(from_pattern.findall(sql))
+        tables.extend(_FROM_TABLE_RE.findall(sql))
 
         # JOIN 절 테이블
-        join_pattern = re.compile(
-            r'\bJOIN\s+(\w+)',
-            re.IGNORECASE
-        )
-        tables.extend(join_pattern.findall(sql))
+        tables.extend(_JOIN_TABLE_RE.findall(sql))
 
         return list(set(tables))
 
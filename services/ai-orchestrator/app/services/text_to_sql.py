@@ -3,26 +3,69 @@ Text-to-SQL Service: 자연어를 SQL로 변환하고 실행
 """
 
 import os
+import copy
 import json
+import hashlib
+import asyncio
 import logging
 import re
+import sys
+import threading
 from datetime import datetime
-from typing import Optional, List, Dict, Any, Tuple
-from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Optional, List, Dict, Any, Iterator, Sequence, Tuple
+from dataclasses import dataclass
 
 import psycopg
+from psycopg.adapt import Loader
 from psycopg.rows import dict_row
 
 from app.services.sql_validator import SqlValidator, ValidationResult, get_sql_validator
 from app.services.rag_service import get_rag_service
+from app.services.sql_templates import match_sql_template
+from app.services.ttl_cache import TtlLruCache
 
 logger = logging.getLogger(__name__)
 
+# LLM 응답 JSON 파싱: orjson 사용 가능 시 우선 사용 (langchain 의존성으로 설치됨)
+# orjson.JSONDecodeError는 json.JSONDecodeError의 하위 클래스이므로 예외 처리는 동일
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# LLM 응답의 마크다운 코드 펜스 (```sql ... ```) 제거용
+_CODE_FENCE_RE = re.compile(r'^```(?:sql)?[ \t]*\n?|\n?```[ \t]*$', re.MULTILINE | re.IGNORECASE)
+# LLM 응답의 ```json ... ``` 블록 추출용
+_JSON_BLOCK_RE = re.compile(r'```json\s*(.*?)\s*```', re.DOTALL)
+# 스트리밍 중인 응답에서 닫힌 "sql" 문자열 필드 탐지 (이스케이프된 따옴표 허용)
+_STREAMED_SQL_FIELD_RE = re.compile(r'"sql"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+
+def _extract_streamed_sql(buffer: str) -> Optional[str]:
+    """
+    스트리밍 중인 LLM 응답에서 완성된 sql 필드 값 추출
+
+    Returns:
+        sql 문자열 (필드가 아직 닫히지 않았으면 None)
+    """
+    match = _STREAMED_SQL_FIELD_RE.search(buffer)
+    if not match:
+        return None
+    try:
+        return _json_loads(f'"{match.group(1)}"')
+    except ValueError:
+        return None
+
 
 # ============================================
 # 집계 쿼리 감지 및 컨텍스트 생성
 # ============================================
 
+# 요청마다 생성되는 결과/컨텍스트 객체는 __slots__ 사용 (Python 3.10+에서만 지원)
+_DATACLASS_SLOTS: Dict[str, Any] = {"slots": True} if sys.version_info >= (3, 10) else {}
+
 # 집계 함수 패턴 (대소문자 무관)
 AGGREGATION_FUNCTIONS = {
     "SUM": r'\bSUM\s*\(\s*([^)]+)\s*\)',
@@ -32,8 +75,35 @@ AGGREGATION_FUNCTIONS = {
     "MIN": r'\bMIN\s*\(\s*([^)]+)\s*\)',
 }
 
+# 집계 함수 통합 패턴 (SELECT 절을 한 번만 스캔)
+_AGGREGATION_RE = re.compile(
+    r'\b(' + '|'.join(AGGREGATION_FUNCTIONS) + r')\s*\(\s*([^)]+)\s*\)',
+    re.IGNORECASE
+)
+# 결과 순서를 AGGREGATION_FUNCTIONS 정의 순서(SUM → COUNT → ...)로 유지하기 위한 인덱스
+_AGGREGATION_ORDER = {name: idx for idx, name in enumerate(AGGREGATION_FUNCTIONS)}
+
+# 단일 집계 함수만 SELECT 하는 쿼리 (예: SELECT COUNT(*) FROM ...) 빠른 경로
+_FAST_AGG_RE = re.compile(
+    r'^\s*SELECT\s+(' + '|'.join(AGGREGATION_FUNCTIONS) + r')\s*\(\s*([*\w.]+)\s*\)'
+    r'(?:\s+AS\s+([a-zA-Z_][a-zA-Z0-9_]*))?\s+FROM\b',
+    re.IGNORECASE
+)
+_SELECT_CLAUSE_RE = re.compile(r'\bSELECT\s+(.+?)\s+FROM\b', re.IGNORECASE | re.DOTALL)
+_ALIAS_RE = re.compile(r'^(?:AS\s+)?([a-zA-Z_][a-zA-Z0-9_]*)', re.IGNORECASE)
+_ALIAS_STOP_WORDS = frozenset(('FROM', 'WHERE', 'GROUP', 'ORDER', 'LIMIT', 'HAVING', 'AND', 'OR'))
+
+_WITH_RE = re.compile(r'\bWITH\b', re.IGNORECASE)
+_CTE_COMMA_RE = re.compile(r'\s*,')
+_SELECT_KEYWORD_RE = re.compile(r'\bSELECT\b', re.IGNORECASE)
+_GROUP_BY_RE = re.compile(
+    r'\bGROUP\s+BY\s+(.+?)(?=\s*(?:HAVING|ORDER\s+BY|LIMIT|OFFSET|;|$))',
+    re.IGNORECASE | re.DOTALL
+)
+
 
-@dataclass
+# 캐시된 감지 결과를 여러 호출자가 공유하므로 불변(frozen)으로 유지
+@dataclass(frozen=True, **_DATACLASS_SLOTS)
 class AggregationInfo:
     """단일 집계 함수 정보"""
     function: str           # SUM, COUNT, AVG, MAX, MIN
@@ -41,14 +111,14 @@ class AggregationInfo:
     alias: Optional[str]    # AS 별칭 (있으면)
 
 
-@dataclass
+@dataclass(frozen=True, **_DATACLASS_SLOTS)
 class AggregationContext:
     """집계 쿼리 컨텍스트 메타데이터"""
     query_type: str                     # "NEW_QUERY" 또는 "REFINEMENT"
     based_on_filters: List[str]         # 적용된 WHERE 조건들 (원본 SQL)
     humanized_filters: List[str]        # 사용자 친화적 표현 (한글)
     source_row_count: Optional[int]     # 이전 쿼리 결과 건수 (있으면)
-    aggregations: List[AggregationInfo] # 감지된 집계 함수들
+    aggregations: Tuple[AggregationInfo, ...]  # 감지된 집계 함수들 (캐시 결과 공유)
     has_group_by: bool                  # GROUP BY 포함 여부
     group_by_columns: List[str]         # GROUP BY 컬럼들
 
@@ -63,47 +133,61 @@ def detect_aggregation_functions(sql: str) -> List[AggregationInfo]:
     Returns:
         감지된 집계 함수 정보 리스트
     """
-    aggregations = []
+    return list(_detect_aggregation_functions_cached(sql))
+
+
+@lru_cache(maxsize=512)
+def _detect_aggregation_functions_cached(sql: str) -> Tuple[AggregationInfo, ...]:
+    """detect_aggregation_functions의 캐시 구현 (SELECT 절 1회 스캔)"""
+    fast_match = _FAST_AGG_RE.match(sql)
+    if fast_match:
+        return (AggregationInfo(
+            function=fast_match.group(1).upper(),
+            target_column=fast_match.group(2),
+            alias=fast_match.group(3)
+        ),)
 
     # SELECT 절 추출
-    select_match = re.search(r'\bSELECT\s+(.+?)\s+FROM\b', sql, re.IGNORECASE | re.DOTALL)
+    select_match = _SELECT_CLAUSE_RE.search(sql)
     if not select_match:
-        return aggregations
+        return ()
 
     select_clause = select_match.group(1)
 
-    for func_name, pattern in AGGREGATION_FUNCTIONS.items():
-        # 해당 집계 함수 찾기
-        matches = re.finditer(pattern, select_clause, re.IGNORECASE)
-        for match in matches:
-            target_column = match.group(1).strip()
-
-            # AS 별칭 찾기 (집계 함수 뒤에 AS 또는 공백 후 별칭)
-            # 예: SUM(amount) AS total_amount 또는 SUM(amount) total_amount
-            full_expr = match.group(0)
-            alias = None
-
-            # select_clause에서 이 표현식 이후의 부분 찾기
-            expr_end_pos = select_clause.find(full_expr) + len(full_expr)
-            remaining = select_clause[expr_end_pos:].strip()
-
-            # AS 키워드 확인
-            as_match = re.match(r'^(?:AS\s+)?([a-zA-Z_][a-zA-Z0-9_]*)', remaining, re.IGNORECASE)
-            if as_match:
-                potential_alias = as_match.group(1).upper()
-                # FROM, WHERE 등 키워드가 아닌 경우만 별칭으로 인정
-                if potential_alias not in ('FROM', 'WHERE', 'GROUP', 'ORDER', 'LIMIT', 'HAVING', 'AND', 'OR'):
-                    alias = as_match.group(1)
-
-            aggregations.append(AggregationInfo(
-                function=func_name,
-                target_column=target_column,
-                alias=alias
-            ))
+    # 모든 집계 함수를 한 번에 찾은 뒤 함수 정의 순서대로 정렬 (동일 함수 내에서는 등장 순서 유지)
+    matches = sorted(
+        _AGGREGATION_RE.finditer(select_clause),
+        key=lambda m: _AGGREGATION_ORDER[m.group(1).upper()]
+    )
+
+    aggregations = []
+    for match in matches:
+        target_column = match.group(2).strip()
+
+        # AS 별칭 찾기 (집계 함수 뒤에 AS 또는 공백 후 별칭)
+        # 예: SUM(amount) AS total_amount 또는 SUM(amount) total_amount
+        full_expr = match.group(0)
+        alias = None
 
-    return aggregations
+        # select_clause에서 이 표현식 이후의 부분 찾기
+        expr_end_pos = select_clause.find(full_expr) + len(full_expr)
+        remaining = select_clause[expr_end_pos:].strip()
 
+        # AS 키워드 확인 (FROM, WHERE 등 키워드가 아닌 경우만 별칭으로 인정)
+        as_match = _ALIAS_RE.match(remaining)
+        if as_match and as_match.group(1).upper() not in _ALIAS_STOP_WORDS:
+            alias = as_match.group(1)
 
+        aggregations.append(AggregationInfo(
+            function=match.group(1).upper(),
+            target_column=target_column,
+            alias=alias
+        ))
+
+    return tuple(aggregations)
+
+
+@lru_cache(maxsize=512)
 def _extract_main_query(sql: str) -> str:
     """
     CTE(WITH ... AS (...)) 블록을 건너뛰고 메인 쿼리 부분만 반환.
@@ -127,11 +211,11 @@ def _extract_main_query(sql: str) -> str:
         메인(외부) SELECT 쿼리 문자열
     """
     stripped = sql.strip()
-    if not re.match(r'\bWITH\b', stripped, re.IGNORECASE):
+    with_match = _WITH_RE.match(stripped)
+    if not with_match:
         return sql
 
     # WITH 키워드 이후부터 탐색
-    with_match = re.match(r'\bWITH\b', stripped, re.IGNORECASE)
     pos = with_match.end()
 
     while pos < len(stripped):
@@ -150,13 +234,13 @@ def _extract_main_query(sql: str) -> str:
             # 여기서 pos 는 닫는 ')' 다음 위치
             # 뒤에 쉼표가 오면 다음 CTE 계속, 아니면 메인 쿼리 시작
             rest = stripped[pos:]
-            comma_match = re.match(r'\s*,', rest)
+            comma_match = _CTE_COMMA_RE.match(rest)
             if comma_match:
                 # 다음 CTE 로 계속
                 pos += comma_match.end()
             else:
                 # WITH 블록 종료 → 이후가 메인 쿼리
-                select_match = re.search(r'\bSELECT\b', rest, re.IGNORECASE)
+                select_match = _SELECT_KEYWORD_RE.search(rest)
                 if select_match:
                     return rest[select_match.start():]
                 return sql  # fallback
@@ -179,23 +263,26 @@ def detect_group_by(sql: str) -> Tuple[bool, List[str]]:
     Returns:
         (has_group_by, group_by_columns) 튜플
     """
+    has_group_by, columns = _detect_group_by_cached(sql)
+    return (has_group_by, list(columns))
+
+
+@lru_cache(maxsize=512)
+def _detect_group_by_cached(sql: str) -> Tuple[bool, Tuple[str, ...]]:
+    """detect_group_by의 캐시 구현 (리파인먼트 흐름에서 동일 SQL 반복 파싱 방지)"""
     # CTE 블록을 제거하고 메인 쿼리만 추출
     main_query = _extract_main_query(sql)
 
     # GROUP BY 절 추출
-    group_by_match = re.search(
-        r'\bGROUP\s+BY\s+(.+?)(?=\s*(?:HAVING|ORDER\s+BY|LIMIT|OFFSET|;|$))',
-        main_query,
-        re.IGNORECASE | re.DOTALL
-    )
+    group_by_match = _GROUP_BY_RE.search(main_query)
 
     if not group_by_match:
-        return (False, [])
+        return (False, ())
 
     group_by_clause = group_by_match.group(1).strip()
 
     # 컬럼 분리 (쉼표로)
-    columns = [col.strip() for col in group_by_clause.split(',')]
+    columns = tuple(col.strip() for col in group_by_clause.split(','))
 
     return (True, columns)
 
@@ -216,8 +303,8 @@ def build_aggregation_context(
     Returns:
         AggregationContext 또는 None (집계 쿼리가 아닌 경우)
     """
-    # 집계 함수 감지
-    aggregations = detect_aggregation_functions(sql)
+    # 집계 함수 감지 (불변 튜플이므로 캐시 결과를 복사 없이 그대로 사용)
+    aggregations = _detect_aggregation_functions_cached(sql)
 
     if not aggregations:
         return None  # 집계 쿼리가 아님
@@ -233,7 +320,7 @@ def build_aggregation_context(
 
     return AggregationContext(
         query_type="REFINEMENT" if is_refinement else "NEW_QUERY",
-        based_on_filters=where_conditions,
+        based_on_filters=list(where_conditions),
         humanized_filters=humanized_conditions,
         source_row_count=previous_row_count,
         aggregations=aggregations,
@@ -266,56 +353,218 @@ def aggregation_context_to_dict(ctx: AggregationContext) -> Dict[str, Any]:
 # WHERE 조건 추출 및 병합 유틸리티
 # ============================================
 
-def extract_where_conditions(sql: str) -> List[str]:
+_WHERE_CLAUSE_RE = re.compile(
+    r'\bWHERE\s+(.+?)(?=\s*(?:GROUP\s+BY|ORDER\s+BY|LIMIT|OFFSET|;|$))',
+    re.IGNORECASE | re.DOTALL
+)
+
+# 조건 필드명 추출 패턴 (비교 연산자 / IS [NOT] NULL)
+_CONDITION_FIELD_PATTERNS = (
+    re.compile(r'^(\w+)\s*(?:=|!=|<>|>=|<=|>|<|LIKE|ILIKE|IN|NOT\s+IN|BETWEEN)', re.IGNORECASE),
+    re.compile(r'^(\w+)\s+IS\s+(?:NOT\s+)?NULL', re.IGNORECASE),
+)
+
+# ============================================
+# 조건 토크나이저 (humanize_where_condition용)
+# ============================================
+
+# 토큰 종류
+_TOK_STRING = "STRING"    # 'literal' (따옴표 제외한 내용)
+_TOK_NUMBER = "NUMBER"    # 연속된 숫자
+_TOK_WORD = "WORD"        # 식별자/키워드 (대문자 정규화)
+_TOK_OP = "OP"            # 비교 연산자
+_TOK_PUNCT = "PUNCT"      # 그 외 단일 문자 ( ) , . - 등
+
+_CLOSE_PAREN_TOKEN = (_TOK_PUNCT, ")")
+
+_COMPARISON_OPERATORS = frozenset(("<=", ">=", "<>", "!="))
+_OPERATOR_CHARS = frozenset("<>=!")
+
+# 등호 조건으로 취급하는 연산자 ('=' 문자를 포함하는 연산자 + 문자열 값)
+_EQ_LIKE_OPERATORS = frozenset(("=", ">=", "<=", "!="))
+
+
+def _parse_interval_literal(literal: str) -> Optional[Tuple[str, str]]:
+    """
+    INTERVAL 리터럴 내용을 (숫자, 단위)로 분리 (정규식 없이 split 사용)
+
+    예: "3 months" → ("3", "months"), "3" → None
+    """
+    parts = literal.split()
+    if len(parts) != 2 or literal[0].isspace() or literal[-1].isspace():
+        return None
+    num, unit = parts
+    if not num.isdecimal() or not unit.replace("_", "a").isalnum():
+        return None
+    return num, unit
+
+
+def _tokenize_condition(condition: str) -> List[Tuple[str, str]]:
+    """
+    WHERE 조건 문자열을 한 번의 좌→우 스캔으로 토큰화
+
+    따옴표 상태를 추적하여 문자열 리터럴 내부의 연산자/키워드는 토큰으로 취급하지 않습니다.
+
+    예: "amount >= 10000" → [(WORD, AMOUNT), (OP, >=), (NUMBER, 10000)]
+    """
+    tokens: List[Tuple[str, str]] = []
+    i, n = 0, len(condition)
+
+    while i < n:
+        ch = condition[i]
+
+        if ch.isspace():
+            i += 1
+        elif ch == "'":
+            end = condition.find("'", i + 1)
+            if end == -1:
+                # 닫히지 않은 따옴표는 일반 문자로 취급
+                tokens.append((_TOK_PUNCT, ch))
+                i += 1
+            else:
+                tokens.append((_TOK_STRING, condition[i + 1:end]))
+                i = end + 1
+        elif ch.isdecimal():
+            j = i + 1
+            while j < n and condition[j].isdecimal():
+                j += 1
+            tokens.append((_TOK_NUMBER, condition[i:j]))
+            i = j
+        elif ch.isalpha() or ch == "_":
+            j = i + 1
+            while j < n and (condition[j].isalnum() or condition[j] == "_"):
+                j += 1
+            word = condition[i:j]
+            # SQL 키워드는 대부분 이미 대문자이므로 필요할 때만 변환
+            tokens.append((_TOK_WORD, word if word.isupper() else word.upper()))
+            i = j
+        elif ch in _OPERATOR_CHARS:
+            pair = condition[i:i + 2]
+            if pair in _COMPARISON_OPERATORS:
+                tokens.append((_TOK_OP, pair))
+                i += 2
+            else:
+                tokens.append((_TOK_OP, ch))
+                i += 1
+        else:
+            tokens.append((_TOK_PUNCT, ch))
+            i += 1
+
+    return tokens
+
+
+def _next_token(tokens: List[Tuple[str, str]], idx: int) -> Tuple[Optional[str], Optional[str]]:
+    """idx 위치의 토큰 반환 (범위 밖이면 (None, None))"""
+    return tokens[idx] if idx < len(tokens) else (None, None)
+
+
+def extract_where_conditions(sql: str) -> Tuple[str, ...]:
     """
     SQL에서 WHERE 절의 개별 조건들을 추출
 
+    대화 이력의 SQL은 턴마다 반복 파싱되므로 결과를 SQL 문자열 기준으로 캐싱합니다.
+
     Args:
         sql: SQL 쿼리 문자열
 
     Returns:
-        개별 조건 문자열 리스트 (예: ["created_at >= '2024-01-01'", "status = 'DONE'"])
+        개별 조건 문자열 튜플 (예: ("created_at >= '2024-01-01'", "status = 'DONE'"))
+        불변 튜플이므로 캐시된 결과를 복사 없이 그대로 반환
     """
-    if not sql:
-        return []
-
-    # WHERE 절 추출 (WHERE ... 부터 GROUP BY/ORDER BY/LIMIT/; 전까지)
-    where_pattern = r'\bWHERE\s+(.+?)(?=\s*(?:GROUP\s+BY|ORDER\s+BY|LIMIT|OFFSET|;|$))'
-    match = re.search(where_pattern, sql, re.IGNORECASE | re.DOTALL)
+    # WHERE 키워드가 없으면 정규식/캐시 조회 없이 바로 반환
+    if not sql or "where" not in sql.lower():
+        return ()
 
-    if not match:
-        return []
+    return _extract_where_conditions_cached(sql)
 
-    where_clause = match.group(1).strip()
 
-    # AND로 분리 (단, 괄호 안의 AND는 무시)
-    conditions = []
-    current_condition = ""
-    paren_depth = 0
+def _split_and_conditions(clause: str) -> List[str]:
+    """
+    WHERE 절을 최상위 AND 기준으로 분리 (문자 단위 1회 스캔)
 
-    # 토큰 단위로 분리
-    tokens = re.split(r'(\s+AND\s+)', where_clause, flags=re.IGNORECASE)
+    - 괄호 깊이와 따옴표 상태를 추적하여 괄호/문자열 리터럴 안의 AND는 무시
+    - BETWEEN 뒤의 첫 AND는 범위 구분자이므로 분리하지 않음
+    - AND는 앞뒤가 공백인 독립 단어일 때만 구분자로 인정
 
-    for token in tokens:
-        # AND 토큰인 경우
-        if re.match(r'^\s*AND\s*$', token, re.IGNORECASE):
-            if paren_depth == 0 and current_condition.strip():
-                conditions.append(current_condition.strip())
-                current_condition = ""
-            else:
-                current_condition += token
+    예: "status = 'A AND B' AND (x = 1 AND y = 2)" → ["status = 'A AND B'", "(x = 1 AND y = 2)"]
+    """
+    conditions: List[str] = []
+    depth = 0
+    in_quote = False
+    pending_between = False
+    start = 0
+    i, n = 0, len(clause)
+
+    while i < n:
+        ch = clause[i]
+
+        if in_quote:
+            # '' 이스케이프는 닫힘 → 열림으로 두 번 토글되어 자연스럽게 처리됨
+            if ch == "'":
+                in_quote = False
+            i += 1
+        elif ch == "'":
+            in_quote = True
+            i += 1
+        elif ch == "(":
+            depth += 1
+            i += 1
+        elif ch == ")":
+            depth -= 1
+            i += 1
+        elif (ch.isalpha() or ch == "_") and depth == 0 and i > 0 and clause[i - 1].isspace():
+            # 최상위 수준의 독립 단어: AND / BETWEEN 판별
+            j = i + 1
+            while j < n and (clause[j].isalnum() or clause[j] == "_"):
+                j += 1
+            # AND(3자) / BETWEEN(7자)만 관심 대상이므로 길이가 다르면 대문자 변환 생략
+            word = clause[i:j].upper() if j - i in (3, 7) else ""
+
+            if word == "BETWEEN":
+                pending_between = True
+            elif word == "AND" and j < n and clause[j].isspace():
+                if pending_between:
+                    pending_between = False
+                else:
+                    # 앞뒤 공백을 인덱스로 건너뛰어 한 번만 슬라이싱 (strip 임시 문자열 생성 회피)
+                    begin, end = start, i
+                    while begin < end and clause[begin].isspace():
+                        begin += 1
+                    while end > begin and clause[end - 1].isspace():
+                        end -= 1
+                    if begin < end:
+                        conditions.append(clause[begin:end])
+                        start = j
+            i = j
         else:
-            # 괄호 깊이 추적
-            paren_depth += token.count('(') - token.count(')')
-            current_condition += token
+            i += 1
 
     # 마지막 조건 추가
-    if current_condition.strip():
-        conditions.append(current_condition.strip())
+    last = clause[start:].strip()
+    if last:
+        conditions.append(last)
 
     return conditions
 
 
+@lru_cache(maxsize=1024)
+def _extract_where_conditions_cached(sql: str) -> Tuple[str, ...]:
+    """extract_where_conditions의 캐시 구현 (불변 튜플 반환)"""
+    # WHERE 절 추출 (WHERE ... 부터 GROUP BY/ORDER BY/LIMIT/; 전까지)
+    match = _WHERE_CLAUSE_RE.search(sql)
+
+    if not match:
+        return ()
+
+    where_clause = match.group(1).strip()
+
+    # AND로 분리 (단, 괄호/문자열 안의 AND와 BETWEEN ... AND ...는 무시)
+    conditions = _split_and_conditions(where_clause)
+
+    return tuple(conditions)
+
+
+@lru_cache(maxsize=4096)
 def extract_condition_field(condition: str) -> Optional[str]:
     """
     조건에서 필드명 추출
@@ -324,20 +573,118 @@ def extract_condition_field(condition: str) -> Optional[str]:
         "status = 'DONE'" → "status"
         "merchant_id IN ('mer_001', 'mer_002')" → "merchant_id"
     """
-    # 일반적인 비교 연산자 패턴
-    patterns = [
-        r'^(\w+)\s*(?:=|!=|<>|>=|<=|>|<|LIKE|ILIKE|IN|NOT\s+IN|BETWEEN)',
-        r'^(\w+)\s+IS\s+(?:NOT\s+)?NULL',
-    ]
-
-    for pattern in patterns:
-        match = re.match(pattern, condition.strip(), re.IGNORECASE)
+    stripped = condition.strip()
+    for pattern in _CONDITION_FIELD_PATTERNS:
+        match = pattern.match(stripped)
         if match:
-            return match.group(1).lower()
+            # 필드명은 소수의 고정 집합이므로 intern하여 라벨 맵 조회 시 동일 객체 비교로 처리
+            return sys.intern(match.group(1).lower())
 
     return None
 
 
+# 필드명 → 한글 라벨 매핑
+_FIELD_LABELS = {
+    "created_at": "기간",
+    "approved_at": "승인일",
+    "merchant_id": "가맹점",
+    "status": "상태",
+    "method": "결제수단",
+    "amount": "금액",
+    "order_name": "상품명",
+    "customer_id": "고객",
+    "payment_key": "결제키",
+    "settlement_date": "정산일",
+}
+
+# 상태값 한글 매핑
+_STATUS_LABELS = {
+    "DONE": "완료",
+    "CANCELED": "취소",
+    "PARTIAL_CANCELED": "부분취소",
+    "IN_PROGRESS": "진행중",
+    "READY": "대기",
+    "FAILED": "실패",
+    "EXPIRED": "만료",
+    "PENDING": "대기중",
+    "PROCESSED": "처리완료",
+    "PAID_OUT": "지급완료",
+    "ACTIVE": "활성",
+    "SUSPENDED": "정지",
+    "TERMINATED": "해지",
+}
+
+# 결제수단 한글 매핑
+_METHOD_LABELS = {
+    "CARD": "카드",
+    "VIRTUAL_ACCOUNT": "가상계좌",
+    "EASY_PAY": "간편결제",
+    "TRANSFER": "계좌이체",
+    "MOBILE": "모바일",
+    "BANK_TRANSFER": "계좌이체",
+}
+
+# 시간 단위 한글 매핑
+_TIME_UNIT_LABELS = {
+    "months": "개월",
+    "month": "개월",
+    "days": "일",
+    "day": "일",
+    "weeks": "주",
+    "week": "주",
+    "years": "년",
+    "year": "년",
+    "hours": "시간",
+    "hour": "시간",
+}
+
+
+# 비교 연산자 → 한글 표현
+_COMPARISON_SUFFIXES = {
+    ">=": "이상",
+    "<=": "이하",
+    ">": "초과",
+    "<": "미만",
+}
+
+
+def _format_comparison(label: Optional[str], operator: str, number: str) -> str:
+    """비교 조건 표현 (예: "금액: 100,000 이상")"""
+    return f"{label}: {int(number):,} {_COMPARISON_SUFFIXES[operator]}"
+
+
+# 값 번역 대상 필드 → 값 라벨 맵 (필드 추가 시 여기에만 등록)
+_FIELD_VALUE_MAPS = {
+    "status": _STATUS_LABELS,
+    "method": _METHOD_LABELS,
+}
+
+# 짧은 질문이라도 이 키워드가 있으면 RAG 조회 (비즈니스 용어 정의 문서 참조 필요)
+# - 엔티티(테이블명 + 한글명), 컬럼(_FIELD_LABELS), 비율/지표 용어
+_RAG_DOMAIN_KEYWORDS = frozenset(
+    [
+        "payments", "merchants", "refunds", "settlements", "customers", "orders",
+        "결제", "가맹점", "환불", "정산", "고객", "주문", "잔액", "수수료", "매출", "승인",
+        "율", "률", "비율", "점유율",
+    ]
+    + list(_FIELD_LABELS)
+    + list(_FIELD_LABELS.values())
+)
+
+
+def _has_domain_keyword(question: str) -> bool:
+    """질문에 스키마/비즈니스 키워드가 포함되어 있는지 확인"""
+    lowered = question.lower()
+    return any(keyword in lowered for keyword in _RAG_DOMAIN_KEYWORDS)
+
+
+def _translate_condition_value(field: Optional[str], value: str) -> str:
+    """상태/결제수단 값은 한글로 변환, 그 외는 원본 유지"""
+    mapper = _FIELD_VALUE_MAPS.get(field)
+    return mapper.get(value, value) if mapper else value
+
+
+@lru_cache(maxsize=2048)
 def humanize_where_condition(condition: str) -> str:
     """
     SQL WHERE 조건을 사용자 친화적 표현으로 변환
@@ -346,144 +693,115 @@ def humanize_where_condition(condition: str) -> str:
         "status = 'DONE'" → "상태: 완료"
         "merchant_id = 'mer_001'" → "가맹점: mer_001"
     """
-    # 필드명 → 한글 라벨 매핑
-    FIELD_LABELS = {
-        "created_at": "기간",
-        "approved_at": "승인일",
-        "merchant_id": "가맹점",
-        "status": "상태",
-        "method": "결제수단",
-        "amount": "금액",
-        "order_name": "상품명",
-        "customer_id": "고객",
-        "payment_key": "결제키",
-        "settlement_date": "정산일",
-    }
-
-    # 상태값 한글 매핑
-    STATUS_LABELS = {
-        "DONE": "완료",
-        "CANCELED": "취소",
-        "PARTIAL_CANCELED": "부분취소",
-        "IN_PROGRESS": "진행중",
-        "READY": "대기",
-        "FAILED": "실패",
-        "EXPIRED": "만료",
-        "PENDING": "대기중",
-        "PROCESSED": "처리완료",
-        "PAID_OUT": "지급완료",
-        "ACTIVE": "활성",
-        "SUSPENDED": "정지",
-        "TERMINATED": "해지",
-    }
-
-    # 결제수단 한글 매핑
-    METHOD_LABELS = {
-        "CARD": "카드",
-        "VIRTUAL_ACCOUNT": "가상계좌",
-        "EASY_PAY": "간편결제",
-        "TRANSFER": "계좌이체",
-        "MOBILE": "모바일",
-        "BANK_TRANSFER": "계좌이체",
-    }
-
-    # 시간 단위 한글 매핑
-    TIME_UNIT_LABELS = {
-        "months": "개월",
-        "month": "개월",
-        "days": "일",
-        "day": "일",
-        "weeks": "주",
-        "week": "주",
-        "years": "년",
-        "year": "년",
-        "hours": "시간",
-        "hour": "시간",
-    }
-
     # 필드명 추출
     field = extract_condition_field(condition)
-    label = FIELD_LABELS.get(field, field) if field else None
-
-    # 패턴 1: INTERVAL (시간 범위)
-    # 예: "created_at >= NOW() - INTERVAL '3 months'"
-    interval_match = re.search(r"INTERVAL\s+'(\d+)\s+(\w+)'", condition, re.IGNORECASE)
-    if interval_match:
-        num, unit = interval_match.groups()
-        unit_kr = TIME_UNIT_LABELS.get(unit.lower(), unit)
-        return f"{label}: 최근 {num}{unit_kr}"
+    label = _FIELD_LABELS.get(field, field) if field else None
+
+    # 조건을 한 번만 스캔하여 토큰화한 뒤 구조 매칭
+    tokens = _tokenize_condition(condition)
+
+    # 빠른 경로: 가장 흔한 "필드 연산자 값" 3토큰 조건은 구조 매칭 없이 바로 분기
+    # 예: "status = 'DONE'", "amount >= 100000"
+    if len(tokens) == 3 and tokens[0][0] == _TOK_WORD and tokens[0][1] != "INTERVAL" and tokens[1][0] == _TOK_OP:
+        operator = tokens[1][1]
+        value_kind, value = tokens[2]
+        if value_kind == _TOK_NUMBER and operator in _COMPARISON_SUFFIXES:
+            return _format_comparison(label, operator, value)
+        if value_kind == _TOK_STRING and value and operator in _EQ_LIKE_OPERATORS:
+            return f"{label}: {_translate_condition_value(field, value)}"
+        return condition
+
+    # 구조 매칭 결과 (패턴 우선순위: INTERVAL > LIKE > IN > BETWEEN > 비교 연산자 > 등호)
+    like = in_values = between = None
+    comparisons: Dict[str, str] = {}    # 비교 연산자(>=, <=, >, <) → 뒤따르는 첫 숫자
+    eq_value = None
+    has_interval_keyword = False
+
+    for idx, (kind, value) in enumerate(tokens):
+        next_kind, next_value = _next_token(tokens, idx + 1)
+
+        if kind == _TOK_WORD:
+            if value == "INTERVAL":
+                has_interval_keyword = True
+                # 예: "created_at >= NOW() - INTERVAL '3 months'"
+                # 최우선 패턴이므로 매칭 즉시 반환
+                if next_kind == _TOK_STRING:
+                    interval = _parse_interval_literal(next_value)
+                    if interval:
+                        num, unit = interval
+                        unit_kr = _TIME_UNIT_LABELS.get(unit.lower(), unit)
+                        return f"{label}: 최근 {num}{unit_kr}"
+            elif value in ("LIKE", "ILIKE"):
+                # 예: "order_name LIKE '%도서%'"
+                if (like is None and next_kind == _TOK_STRING and len(next_value) > 2
+                        and next_value[0] == "%" and next_value[-1] == "%" and "%" not in next_value[1:-1]):
+                    like = next_value[1:-1]
+            elif value == "IN":
+                # 예: "status IN ('DONE', 'CANCELED')"
+                if in_values is None and next_kind == _TOK_PUNCT and next_value == "(":
+                    try:
+                        close = tokens.index(_CLOSE_PAREN_TOKEN, idx + 2)
+                    except ValueError:
+                        close = None
+                    if close is not None and close > idx + 2:
+                        in_values = [v for k, v in tokens[idx + 2:close] if k == _TOK_STRING]
+            elif value == "BETWEEN":
+                # 예: "amount BETWEEN 10000 AND 50000"
+                if between is None and next_kind == _TOK_NUMBER and _next_token(tokens, idx + 2) == (_TOK_WORD, "AND"):
+                    high_kind, high_value = _next_token(tokens, idx + 3)
+                    if high_kind == _TOK_NUMBER:
+                        between = (next_value, high_value)
+        elif kind == _TOK_OP:
+            if next_kind == _TOK_NUMBER:
+                # 예: "amount >= 100000" (>=, <=, >, < 만 기록)
+                if value in _COMPARISON_SUFFIXES:
+                    comparisons.setdefault(value, next_value)
+            elif next_kind == _TOK_STRING and next_value and value in _EQ_LIKE_OPERATORS:
+                # 예: "status = 'DONE'", "created_at >= '2024-01-01'"
+                if eq_value is None:
+                    eq_value = next_value
+
+    # 패턴 1: INTERVAL (시간 범위) → 스캔 중 매칭 즉시 반환됨
 
     # 패턴 2: LIKE (부분 일치)
-    # 예: "order_name LIKE '%도서%'"
-    like_match = re.search(r"LIKE\s+'%([^%]+)%'", condition, re.IGNORECASE)
-    if like_match:
-        keyword = like_match.group(1)
-        return f"{label}: {keyword} 포함"
+    if like is not None:
+        return f"{label}: {like} 포함"
 
     # 패턴 3: IN (다중 값)
-    # 예: "status IN ('DONE', 'CANCELED')"
-    in_match = re.search(r"IN\s*\(([^)]+)\)", condition, re.IGNORECASE)
-    if in_match:
-        values = in_match.group(1)
-        # 값 추출 및 변환
-        raw_values = re.findall(r"'([^']+)'", values)
-        if field == "status":
-            translated = [STATUS_LABELS.get(v, v) for v in raw_values]
-        elif field == "method":
-            translated = [METHOD_LABELS.get(v, v) for v in raw_values]
-        else:
-            translated = raw_values
-        return f"{label}: {', '.join(translated)}"
+    if in_values is not None:
+        # 번역 대상 필드가 아니면 값 목록을 그대로 join (리스트 재생성 생략)
+        mapper = _FIELD_VALUE_MAPS.get(field)
+        joined = ", ".join(mapper.get(v, v) for v in in_values) if mapper else ", ".join(in_values)
+        return f"{label}: {joined}"
 
     # 패턴 4: 범위 (BETWEEN)
-    # 예: "amount BETWEEN 10000 AND 50000"
-    between_match = re.search(r"BETWEEN\s+(\d+)\s+AND\s+(\d+)", condition, re.IGNORECASE)
-    if between_match:
-        low, high = between_match.groups()
+    if between:
+        low, high = between
         return f"{label}: {int(low):,} ~ {int(high):,}"
 
-    # 패턴 5: 비교 연산자
-    # >= 패턴: "amount >= 100000"
-    gte_match = re.search(r">=\s*(\d+)", condition)
-    if gte_match and "INTERVAL" not in condition.upper():
-        value = int(gte_match.group(1))
-        return f"{label}: {value:,} 이상"
-
-    # <= 패턴
-    lte_match = re.search(r"<=\s*(\d+)", condition)
-    if lte_match:
-        value = int(lte_match.group(1))
-        return f"{label}: {value:,} 이하"
-
-    # > 패턴
-    gt_match = re.search(r"(?<!>)>\s*(\d+)", condition)
-    if gt_match and "INTERVAL" not in condition.upper() and ">=" not in condition:
-        value = int(gt_match.group(1))
-        return f"{label}: {value:,} 초과"
-
-    # < 패턴
-    lt_match = re.search(r"(?<!<)<\s*(\d+)", condition)
-    if lt_match and "<=" not in condition:
-        value = int(lt_match.group(1))
-        return f"{label}: {value:,} 미만"
+    # 패턴 5: 비교 연산자 (INTERVAL 조건 제외)
+    if ">=" in comparisons and not has_interval_keyword:
+        operator = ">="
+    elif "<=" in comparisons:
+        operator = "<="
+    elif ">" in comparisons and not has_interval_keyword and ">=" not in comparisons:
+        operator = ">"
+    elif "<" in comparisons and "<=" not in comparisons:
+        operator = "<"
+    else:
+        operator = None
+    if operator:
+        return _format_comparison(label, operator, comparisons[operator])
 
     # 패턴 6: 등호 (=) - 마지막에 처리 (다른 패턴 우선)
-    # 예: "status = 'DONE'" 또는 "merchant_id = 'mer_001'"
-    eq_match = re.search(r"=\s*'([^']+)'", condition)
-    if eq_match:
-        value = eq_match.group(1)
-        # 상태/결제수단 한글 변환
-        if field == "status":
-            value = STATUS_LABELS.get(value, value)
-        elif field == "method":
-            value = METHOD_LABELS.get(value, value)
-        return f"{label}: {value}"
+    if eq_value is not None:
+        return f"{label}: {_translate_condition_value(field, eq_value)}"
 
     # 기본: 원본 조건 반환 (변환 실패 시)
     return condition
 
 
-def merge_where_conditions(existing: List[str], new: List[str]) -> List[str]:
+def merge_where_conditions(existing: Sequence[str], new: Sequence[str]) -> Tuple[str, ...]:
     """
     기존 조건과 새 조건을 병합
 
@@ -496,33 +814,26 @@ def merge_where_conditions(existing: List[str], new: List[str]) -> List[str]:
         new: 새 WHERE 조건 리스트
 
     Returns:
-        병합된 조건 리스트
+        병합된 조건 튜플
     """
     if not existing:
-        return new
+        return tuple(new)
     if not new:
-        return existing
+        return tuple(existing)
 
     # 기존 조건을 필드명으로 매핑
-    existing_by_field: Dict[str, str] = {}
-    for cond in existing:
-        field_name = extract_condition_field(cond)
-        if field_name:
-            existing_by_field[field_name] = cond
-        else:
-            # 필드명 추출 실패 시 원본 유지
-            existing_by_field[cond] = cond
-
-    # 새 조건으로 덮어쓰기
-    for cond in new:
-        field_name = extract_condition_field(cond)
-        if field_name:
-            existing_by_field[field_name] = cond
-        else:
-            # 필드명 추출 실패 시 그냥 추가
-            existing_by_field[cond] = cond
+    merged: Dict[str, str] = dict(_condition_key_pairs(existing))
+
+    # 새 조건으로 덮어쓰기 (dict 삽입 순서 유지 → 대체된 조건은 기존 위치 유지)
+    merged.update(_condition_key_pairs(new))
+
+    return tuple(merged.values())
+
 
-    return list(existing_by_field.values())
+def _condition_key_pairs(conditions: Sequence[str]) -> Iterator[Tuple[str, str]]:
+    """(병합 키, 조건) 쌍 생성 (필드명 추출 실패 시 조건 원문을 키로 사용)"""
+    for cond in conditions:
+        yield (extract_condition_field(cond) or cond), cond
 
 
 # ============================================
@@ -548,6 +859,10 @@ SCHEMA_PROMPT = """
 | failure_message | TEXT | 실패 메시지 |
 | created_at | TIMESTAMPTZ | 생성 시간 |
 
+#### Indexes
+- (merchant_id, created_at), (merchant_id, status), (status, created_at), (payment_key)
+- (failure_code, created_at) WHERE status='ABORTED' (부분 인덱스)
+
 ### merchants (가맹점)
 | Column | Type | Description |
 |--------|------|-------------|
@@ -715,233 +1030,80 @@ SCHEMA_PROMPT = """
 """
 
 
-@dataclass
-class SqlResult:
-    """SQL 실행 결과"""
-    success: bool
-    data: List[Dict[str, Any]]
-    row_count: int                              # 반환된 행 수
-    sql: str
-    error: Optional[str] = None
-    execution_time_ms: Optional[float] = None
-    total_count: Optional[int] = None           # 전체 건수 (COUNT 쿼리 결과)
-    is_truncated: bool = False                  # max_rows 초과로 잘렸는지 여부
-
-
-@dataclass
-class ConversationContext:
-    """연속 대화 컨텍스트"""
-    previous_question: Optional[str]
-    previous_sql: Optional[str]
-    previous_result_summary: Optional[str]
-    # 연속 대화용 추가 필드
-    accumulated_where_conditions: List[str] = field(default_factory=list)
-    is_refinement: bool = False  # True면 이전 WHERE 조건 유지 필요
-    # 대화 기반 맥락 처리용 전체 대화 이력
-    conversation_history: List[Dict[str, Any]] = field(default_factory=list)
+# ============================================
+# SQL 생성 프롬프트 (정적 영역)
+# - 요청과 무관하게 항상 동일한 내용만 포함 (날짜/RAG/대화 이력 제외)
+# - 바이트 단위로 동일하게 유지되어야 LLM 제공자 프롬프트 캐싱이 적중함
+# ============================================
 
+# 시스템 지시 (간결하게) - 일반 문자열 사용 (플레이스홀더 충돌 방지)
+_SYSTEM_RULES = """
+당신은 PostgreSQL SQL 전문가입니다.
+사용자의 자연어 질문을 분석하여 정확한 SELECT 쿼리를 생성합니다.
 
-class TextToSqlService:
-    """
-    Text-to-SQL 서비스
+## 기본 규칙
+- SELECT 문만 생성 (INSERT, UPDATE, DELETE 금지)
+- 테이블/컬럼명은 snake_case 사용
+- 문자열 비교 시 정확한 값 사용 (예: status = 'DONE')
+- LIMIT: 사용자가 건수를 명시한 경우에만 추가
+- 결제 실패/오류 조회: status='ABORTED' 사용, "상세" 키워드 시 failure_code와 failure_message 모두 SELECT, "건수" 키워드 시 COUNT(*) 집계 + GROUP BY 필수
+- 엔티티 선택: 질문의 핵심 의도에 맞는 테이블 사용. "거래 건수/결제 건수"는 payments, "정산"은 settlements
+- 재시도 시: 이전 SQL의 테이블을 유지하고 SQL 구문만 수정
+"""
 
-    자연어 질문을 SQL로 변환하고, 읽기 전용 DB에서 실행합니다.
+# 시간 그룹핑 / 응답 형식 / 차트 타입 / 인사이트 템플릿 가이드
+_RESPONSE_FORMAT_RULES = """
+## 시간 그룹핑 시 포맷팅 (중요!)
+GROUP BY로 시간을 묶을 때, 사용자가 읽기 쉬운 형태로 포맷팅하세요:
+- 월별: TO_CHAR(DATE_TRUNC('month', created_at), 'YYYY-MM') AS month
+- 일별: TO_CHAR(DATE_TRUNC('day', created_at), 'YYYY-MM-DD') AS date
+- 주별: TO_CHAR(DATE_TRUNC('week', created_at), 'YYYY-MM-DD') AS week
+- 연별: TO_CHAR(DATE_TRUNC('year', created_at), 'YYYY') AS year
 
-    보안 레이어:
-    1. PostgreSQL 읽기 전용 계정 (DB 레벨)
-    2. SqlValidator (애플리케이션 레벨)
-    3. 실행 제한 (타임아웃, 행 수 제한)
-    """
+예시:
+- "월별 매출" → SELECT TO_CHAR(DATE_TRUNC('month', created_at), 'YYYY-MM') AS month, SUM(amount)...
+- 절대로 DATE_TRUNC만 사용하지 마세요 (전체 timestamp가 반환됨)
 
-    def __init__(
-        self,
-        readonly_url: Optional[str] = None,
-        timeout_seconds: int = 30,
-        max_rows: int = 1000,
-        default_limit: int = 1000
-    ):
-        """
-        Args:
-            readonly_url: 읽기 전용 DB 연결 URL
-            timeout_seconds: 쿼리 실행 타임아웃 (초)
-            max_rows: 최대 반환 행 수
-            default_limit: LIMIT 기본값
-        """
-        self.readonly_url = readonly_url or os.getenv(
-            "DATABASE_READONLY_URL",
-            os.getenv("DATABASE_URL")  # 폴백: 기본 DB URL
-        )
-        self.timeout_ms = timeout_seconds * 1000
-        self.max_rows = max_rows
-        self.default_limit = default_limit
+## 응답 형식 (JSON)
+반드시 아래 JSON 형식으로만 응답하세요:
 
-        self.validator = get_sql_validator(max_rows=max_rows, default_limit=default_limit)
+```json
+{
+  "sql": "SELECT ... ;",
+  "chartType": "line | bar | pie | none",
+  "chartReason": "판단 근거",
+  "insightTemplate": "한국어 인사이트 템플릿 (chartType이 none이 아닐 때만)"
+}
+```
 
-        # LLM 설정
-        self._llm_provider = os.getenv("LLM_PROVIDER", "openai").lower()
-        self._llm = None
+### chartType 결정 기준:
+- **line**: 시계열 데이터 (날짜/시간 기준 GROUP BY) + 추이/변화/트렌드/일별/월별/주별 키워드
+- **bar**: 카테고리별 비교 (가맹점별, 상태별 등)
+- **pie**: 비율/점유율/분포 키워드 + 적은 카테고리 (≤10개)
+- **none**: 차트 요청 키워드("그래프", "차트", "시각화") 없음 → 테이블로 표시
 
-        # RAG 설정
-        self._rag_enabled = os.getenv("RAG_ENABLED", "true").lower() == "true"
-        self._rag_top_k = int(os.getenv("RAG_TOP_K", "3"))
+중요: 사용자가 "그래프", "차트", "시각화" 등을 명시적으로 요청한 경우에만 line/bar/pie 중 하나를 선택하세요.
+그렇지 않으면 chartType은 "none"으로 설정하세요.
 
-    def _get_llm(self):
-        """LLM 인스턴스 지연 초기화"""
-        if self._llm is None:
-            if self._llm_provider == "anthropic":
-                from langchain_anthropic import ChatAnthropic
-                api_key = os.getenv("ANTHROPIC_API_KEY")
-                if not api_key:
-                    raise ValueError("ANTHROPIC_API_KEY is not set")
-                self._llm = ChatAnthropic(
-                    model=os.getenv("LLM_MODEL", "claude-3-5-haiku-20241022"),
-                    temperature=0,
-                    api_key=api_key
-                )
-            else:
-                from langchain_openai import ChatOpenAI
-                api_key = os.getenv("OPENAI_API_KEY")
-                if not api_key:
-                    raise ValueError("OPENAI_API_KEY is not set")
-                self._llm = ChatOpenAI(
-                    model=os.getenv("LLM_MODEL", "gpt-4o-mini"),
-                    temperature=0,
-                    api_key=api_key
-                )
-            logger.info(f"Text-to-SQL LLM initialized: {self._llm_provider}")
-        return self._llm
+### insightTemplate 작성 가이드:
+chartType이 line/bar/pie인 경우에만 작성하세요. 플레이스홀더를 사용하여 템플릿을 작성합니다.
 
-    def _get_readonly_connection(self):
-        """읽기 전용 DB 연결"""
-        if not self.readonly_url:
-            raise ValueError("DATABASE_READONLY_URL is not set")
+**사용 가능한 플레이스홀더:**
+- {count}: 데이터 포인트 수
+- {total}: Y축 값 합계 (숫자만, 단위는 템플릿에 직접 작성)
+- {avg}: 평균값 (숫자만, 단위는 템플릿에 직접 작성)
+- {max}: 최대값 (숫자만, 단위는 템플릿에 직접 작성)
+- {min}: 최소값 (숫자만, 단위는 템플릿에 직접 작성)
+- {maxCategory}: 최대값을 가진 X축 항목
+- {minCategory}: 최소값을 가진 X축 항목
+- {trend}: 추세 (증가/감소/유지, line 차트에서만)
+- {groupBy}: X축 필드명 (한글)
+- {metric}: Y축 필드명 (한글)
 
-        return psycopg.connect(
-            self.readonly_url,
-            row_factory=dict_row,
-            options=f"-c statement_timeout={self.timeout_ms}"
-        )
-
-    async def _get_rag_context(self, question: str) -> str:
-        """RAG 컨텍스트 조회"""
-        if not self._rag_enabled:
-            return ""
-
-        try:
-            rag_service = get_rag_service()
-            # search_docs() 메서드 사용 (search()는 존재하지 않음)
-            results = await rag_service.search_docs(query=question, k=self._rag_top_k)
-
-            if not results:
-                return ""
-
-            context_parts = []
-            for doc in results:
-                # Document 객체의 속성 접근
-                context_parts.append(f"[{doc.doc_type}] {doc.title}: {doc.content[:500]}")
-
-            logger.info(f"RAG context retrieved: {len(results)} documents")
-            return "\n\n".join(context_parts)
-        except Exception as e:
-            logger.warning(f"RAG context retrieval failed: {e}")
-            return ""
-
-    def _build_prompt(
-        self,
-        question: str,
-        conversation_context: Optional[ConversationContext] = None,
-        rag_context: str = ""
-    ) -> str:
-        """
-        SQL 생성 프롬프트 구성
-
-        대화 기반 맥락 처리 방식:
-        - 규칙 기반 강제 대신 자연스러운 대화 흐름으로 컨텍스트 전달
-        - Claude Code처럼 대화 이력을 명확하게 보여주어 LLM이 맥락을 이해하도록 함
-        """
-        prompt_parts = []
-
-        # 현재 날짜 정보 추가
-        current_date = datetime.now().strftime('%Y-%m-%d')
-        prompt_parts.append(f"현재 날짜: {current_date}")
-
-        # 시간 조회 규칙 (현재 날짜 주입) - f-string 사용
-        time_rules = f"""
-## 시간 조회 규칙 (매우 중요!)
-- 기본: created_at 사용
-- "승인일 기준", "매출 기준" → approved_at 사용
-- **"오늘", "금일", "당일"** → created_at >= '{current_date}' AND created_at < '{current_date}'::date + 1
-- "어제" → created_at >= '{current_date}'::date - 1 AND created_at < '{current_date}'
-- "최근 N개월" → created_at >= NOW() - INTERVAL 'N months'
-
-**필수**: 사용자가 "오늘"을 언급하면 반드시 날짜 조건 created_at >= '{current_date}'를 포함하세요!
-"""
-
-        # 시스템 지시 (간결하게) - 일반 문자열 사용 (플레이스홀더 충돌 방지)
-        prompt_parts.append("""
-당신은 PostgreSQL SQL 전문가입니다.
-사용자의 자연어 질문을 분석하여 정확한 SELECT 쿼리를 생성합니다.
-
-## 기본 규칙
-- SELECT 문만 생성 (INSERT, UPDATE, DELETE 금지)
-- 테이블/컬럼명은 snake_case 사용
-- 문자열 비교 시 정확한 값 사용 (예: status = 'DONE')
-- LIMIT: 사용자가 건수를 명시한 경우에만 추가
-- 결제 실패/오류 조회: status='ABORTED' 사용, "상세" 키워드 시 failure_code와 failure_message 모두 SELECT, "건수" 키워드 시 COUNT(*) 집계 + GROUP BY 필수
-- 엔티티 선택: 질문의 핵심 의도에 맞는 테이블 사용. "거래 건수/결제 건수"는 payments, "정산"은 settlements
-- 재시도 시: 이전 SQL의 테이블을 유지하고 SQL 구문만 수정
-""" + time_rules + """
-## 시간 그룹핑 시 포맷팅 (중요!)
-GROUP BY로 시간을 묶을 때, 사용자가 읽기 쉬운 형태로 포맷팅하세요:
-- 월별: TO_CHAR(DATE_TRUNC('month', created_at), 'YYYY-MM') AS month
-- 일별: TO_CHAR(DATE_TRUNC('day', created_at), 'YYYY-MM-DD') AS date
-- 주별: TO_CHAR(DATE_TRUNC('week', created_at), 'YYYY-MM-DD') AS week
-- 연별: TO_CHAR(DATE_TRUNC('year', created_at), 'YYYY') AS year
-
-예시:
-- "월별 매출" → SELECT TO_CHAR(DATE_TRUNC('month', created_at), 'YYYY-MM') AS month, SUM(amount)...
-- 절대로 DATE_TRUNC만 사용하지 마세요 (전체 timestamp가 반환됨)
-
-## 응답 형식 (JSON)
-반드시 아래 JSON 형식으로만 응답하세요:
-
-```json
-{
-  "sql": "SELECT ... ;",
-  "chartType": "line | bar | pie | none",
-  "chartReason": "판단 근거",
-  "insightTemplate": "한국어 인사이트 템플릿 (chartType이 none이 아닐 때만)"
-}
-```
-
-### chartType 결정 기준:
-- **line**: 시계열 데이터 (날짜/시간 기준 GROUP BY) + 추이/변화/트렌드/일별/월별/주별 키워드
-- **bar**: 카테고리별 비교 (가맹점별, 상태별 등)
-- **pie**: 비율/점유율/분포 키워드 + 적은 카테고리 (≤10개)
-- **none**: 차트 요청 키워드("그래프", "차트", "시각화") 없음 → 테이블로 표시
-
-중요: 사용자가 "그래프", "차트", "시각화" 등을 명시적으로 요청한 경우에만 line/bar/pie 중 하나를 선택하세요.
-그렇지 않으면 chartType은 "none"으로 설정하세요.
-
-### insightTemplate 작성 가이드:
-chartType이 line/bar/pie인 경우에만 작성하세요. 플레이스홀더를 사용하여 템플릿을 작성합니다.
-
-**사용 가능한 플레이스홀더:**
-- {count}: 데이터 포인트 수
-- {total}: Y축 값 합계 (숫자만, 단위는 템플릿에 직접 작성)
-- {avg}: 평균값 (숫자만, 단위는 템플릿에 직접 작성)
-- {max}: 최대값 (숫자만, 단위는 템플릿에 직접 작성)
-- {min}: 최소값 (숫자만, 단위는 템플릿에 직접 작성)
-- {maxCategory}: 최대값을 가진 X축 항목
-- {minCategory}: 최소값을 가진 X축 항목
-- {trend}: 추세 (증가/감소/유지, line 차트에서만)
-- {groupBy}: X축 필드명 (한글)
-- {metric}: Y축 필드명 (한글)
-
-**⚠️ 중요: 단위 표기는 메트릭 유형에 맞게 템플릿에 직접 작성하세요!**
-- **금액 메트릭** (amount, fee, totalAmount 등): "₩{max}", "총 ₩{total}"
-- **건수 메트릭** (count, paymentCount 등): "{max}건", "총 {total}건"
-- **비율 메트릭** (rate, ratio 등): "{max}%"
+**⚠️ 중요: 단위 표기는 메트릭 유형에 맞게 템플릿에 직접 작성하세요!**
+- **금액 메트릭** (amount, fee, totalAmount 등): "₩{max}", "총 ₩{total}"
+- **건수 메트릭** (count, paymentCount 등): "{max}건", "총 {total}건"
+- **비율 메트릭** (rate, ratio 등): "{max}%"
 
 **예시:**
 - 건수 시계열(line): "{groupBy}별 {metric} 추이입니다. 총 {count}개 {groupBy}의 데이터를 분석한 결과, {trend} 추세를 보이며 최고점은 {max}건입니다."
@@ -949,10 +1111,10 @@ chartType이 line/bar/pie인 경우에만 작성하세요. 플레이스홀더를
 - 건수 비교(bar): "{groupBy}별 {metric} 비교 결과, {maxCategory}가 {max}건으로 가장 많고, {minCategory}가 {min}건으로 가장 적습니다."
 - 금액 비교(bar): "{groupBy}별 {metric} 비교 결과, {maxCategory}가 ₩{max}로 가장 높고, {minCategory}가 ₩{min}로 가장 낮습니다."
 - 분포(pie): "{groupBy}별 {metric} 분포입니다. {maxCategory}가 가장 큰 비중을 차지하며, 총 {count}개 항목이 있습니다."
-""")
+"""
 
-        # 복잡한 쿼리 패턴 가이드
-        prompt_parts.append("""
+# 복잡한 쿼리 패턴 가이드
+_COMPLEX_QUERY_PATTERNS = """
 ## 복잡한 쿼리 패턴 가이드
 
 ### 패턴 1: 상위 N개 엔티티의 세부 집계 (Top N + Secondary Aggregation)
@@ -1106,21 +1268,14 @@ GROUP BY p.merchant_id;
 | "비율/점유율" | 패턴 3 (윈도우 함수) |
 | "월별 평균 건수", "N개월 평균" | 패턴 4 (2단계 CTE 집계) |
 | "환불율/환불 비율" | 패턴 5 (LEFT JOIN + FILTER) |
-""")
-
-        # 스키마 정보
-        prompt_parts.append(SCHEMA_PROMPT)
-
-        # RAG 컨텍스트
-        if rag_context:
-            prompt_parts.append(f"\n## 참고 문서\n{rag_context}")
 
-        # 대화 기반 컨텍스트 (자연스러운 대화 형태)
-        if conversation_context and conversation_context.conversation_history:
-            prompt_parts.append(self._build_conversation_flow(conversation_context))
+### 인덱스 활용 규칙
+- failure_code로 필터링할 때는 status='ABORTED' 조건을 먼저 포함 (부분 인덱스 사용)
+- 기간 조건은 컬럼에 함수를 씌우지 말고 created_at >= ... AND created_at < ... 범위 비교로 작성
+"""
 
-        # SQL 생성 가이드라인 - LLM 기반 의도 판단 포함
-        prompt_parts.append("""
+# SQL 생성 가이드라인 - LLM 기반 의도 판단 포함
+_QUERY_CLASSIFICATION_GUIDE = """
 ## 1단계: 질문 유형 판단 (필수)
 SQL을 생성하기 전에, 먼저 사용자 질문이 다음 중 어떤 유형인지 판단하세요:
 
@@ -1155,7 +1310,10 @@ SQL을 생성하기 전에, 먼저 사용자 질문이 다음 중 어떤 유형
 - **new_query**: 이전 WHERE 조건 무시, 새로운 SQL 생성
 - **refinement**: 직전 SQL의 WHERE 조건 유지 + 새 조건 추가
 
-### 같은 컬럼 조건 처리 - 의도 판단 필수!
+"""
+
+# 같은 컬럼 조건 처리 가이드 (new_query/refinement 공통)
+_SAME_COLUMN_CONDITION_GUIDE = """### 같은 컬럼 조건 처리 - 의도 판단 필수!
 
 사용자가 같은 컬럼에 대해 새 조건을 언급할 때, **표현을 분석**하여 의도를 판단하세요:
 
@@ -1178,12 +1336,574 @@ SQL을 생성하기 전에, 먼저 사용자 질문이 다음 중 어떤 유형
 
 중요: refinement 시에는 "직전 쿼리"의 조건만 유지하세요.
 더 오래된 대화의 조건은 새 쿼리에서 리셋되었을 수 있습니다.
-""")
+"""
+
+_QUERY_TYPE_GUIDE = _QUERY_CLASSIFICATION_GUIDE + _SAME_COLUMN_CONDITION_GUIDE
+
+# 서버에서 참조 표현을 감지한 경우(is_refinement=True) 유형 판단 단계 대신 사용
+_REFINEMENT_GUIDE = """
+## 질문 유형: refinement (서버에서 판단 완료)
+현재 질문은 refinement입니다. 직전 SQL의 WHERE 조건을 유지하고 새 필터만 추가하세요.
+
+"""
+
+_STATIC_PROMPT_BASE = [
+    _SYSTEM_RULES,
+    _RESPONSE_FORMAT_RULES,
+    _COMPLEX_QUERY_PATTERNS,
+    SCHEMA_PROMPT,
+]
+
+# 정적 프롬프트 변형 (서버에서 이미 아는 대화 상태별로 미리 구성, 변형마다 프롬프트 캐시 적중)
+# - 기본: 대화 이력 있음, 질문 유형은 LLM이 판단
+# - refinement: 참조 표현 감지됨 → 유형 판단 단계 생략
+# - 첫 턴: 대화 이력 없음 → 유형 판단/이전 조건 관련 가이드 생략
+_STATIC_PROMPT_PREFIX = "\n".join(_STATIC_PROMPT_BASE + [_QUERY_TYPE_GUIDE])
+_STATIC_PROMPT_PREFIX_REFINEMENT = "\n".join(
+    _STATIC_PROMPT_BASE + [_REFINEMENT_GUIDE + _SAME_COLUMN_CONDITION_GUIDE]
+)
+_STATIC_PROMPT_PREFIX_FIRST_TURN = "\n".join(_STATIC_PROMPT_BASE)
+
+
+def _select_static_prompt_prefix(conversation_context: Optional["ConversationContext"]) -> str:
+    """대화 상태에 맞는 정적 프롬프트 변형 선택"""
+    if not conversation_context or not conversation_context.conversation_history:
+        return _STATIC_PROMPT_PREFIX_FIRST_TURN
+    if conversation_context.is_refinement:
+        return _STATIC_PROMPT_PREFIX_REFINEMENT
+    return _STATIC_PROMPT_PREFIX
+
+
+# 시간 조회 규칙 (현재 날짜가 들어가므로 동적 영역에 위치)
+_TIME_RULES_TEMPLATE = """현재 날짜: {current_date}
+
+## 시간 조회 규칙 (매우 중요!)
+- 기본: created_at 사용
+- "승인일 기준", "매출 기준" → approved_at 사용
+- **"오늘", "금일", "당일"** → created_at >= '{current_date}' AND created_at < '{current_date}'::date + 1
+- "어제" → created_at >= '{current_date}'::date - 1 AND created_at < '{current_date}'
+- "최근 N개월" → created_at >= NOW() - INTERVAL 'N months'
+
+**필수**: 사용자가 "오늘"을 언급하면 반드시 날짜 조건 created_at >= '{current_date}'를 포함하세요!
+"""
+
+
+@lru_cache(maxsize=2)
+def _build_date_prompt_block(current_date: str) -> str:
+    """날짜별 시간 조회 규칙 블록 (하루 동안 동일 문자열 재사용)"""
+    return _TIME_RULES_TEMPLATE.format(current_date=current_date)
+
+
+# COUNT 쿼리 변환용: 메인 쿼리 끝의 LIMIT/OFFSET (순서 무관)
+_TRAILING_LIMIT_OFFSET_RE = re.compile(
+    r'(?:\s+(?:LIMIT|OFFSET)\s+\d+){1,2}\s*$',
+    re.IGNORECASE
+)
+_TRAILING_ORDER_BY_RE = re.compile(r'\bORDER\s+BY\s+[^)]+$', re.IGNORECASE)
+# 메인 쿼리 끝의 LIMIT 값 (OFFSET 동반 가능)
+_TRAILING_LIMIT_RE = re.compile(
+    r'\bLIMIT\s+(\d+)(?:\s+OFFSET\s+\d+)?\s*;?\s*$',
+    re.IGNORECASE
+)
+
+
+# ============================================
+# 결과 타입 변환 (timestamp → ISO 문자열)
+# ============================================
+
+# PostgreSQL 시간대 오프셋 ("+09") → ISO 8601 형식 ("+09:00")
+_PG_TZ_HOUR_OFFSET_RE = re.compile(r'([+-]\d{2})$')
+
+
+class _IsoTimestampLoader(Loader):
+    """timestamp 텍스트를 datetime 변환 없이 ISO 8601 문자열로 로드"""
+
+    def load(self, data) -> str:
+        # DateStyle=ISO 출력 형식: 'YYYY-MM-DD HH:MM:SS[.ffffff]'
+        return bytes(data).decode().replace(" ", "T", 1)
+
+
+class _IsoTimestamptzLoader(Loader):
+    """timestamptz 텍스트를 datetime 변환 없이 ISO 8601 문자열로 로드"""
+
+    def load(self, data) -> str:
+        # DateStyle=ISO 출력 형식: 'YYYY-MM-DD HH:MM:SS[.ffffff]+HH[:MM]'
+        value = bytes(data).decode().replace(" ", "T", 1)
+        return _PG_TZ_HOUR_OFFSET_RE.sub(r"\1:00", value)
+
+
+@dataclass(**_DATACLASS_SLOTS)
+class SqlResult:
+    """SQL 실행 결과"""
+    success: bool
+    data: List[Dict[str, Any]]
+    row_count: int                              # 반환된 행 수
+    sql: str
+    error: Optional[str] = None
+    execution_time_ms: Optional[float] = None
+    total_count: Optional[int] = None           # 전체 건수 (COUNT 쿼리 결과)
+    is_truncated: bool = False                  # max_rows 초과로 잘렸는지 여부
+
+
+@dataclass(frozen=True, **_DATACLASS_SLOTS)
+class ConvEntry:
+    """대화 이력 항목 (프롬프트 구성 시 턴마다 dict 조회 대신 속성 접근)"""
+    role: str
+    content: str
+    sql: Optional[str] = None
+    row_count: Optional[int] = None
+    where_conditions: Tuple[str, ...] = ()
+
+    @classmethod
+    def from_message(cls, message: Dict[str, Any]) -> "ConvEntry":
+        """API 대화 이력 메시지(dict) → ConvEntry 변환"""
+        return cls(
+            role=message.get("role", ""),
+            content=message.get("content", ""),
+            sql=message.get("sql"),
+            row_count=message.get("rowCount"),
+            where_conditions=tuple(message.get("whereConditions") or ()),
+        )
+
+
+@dataclass(**_DATACLASS_SLOTS)
+class ConversationContext:
+    """연속 대화 컨텍스트"""
+    previous_question: Optional[str]
+    previous_sql: Optional[str]
+    previous_result_summary: Optional[str]
+    # 연속 대화용 추가 필드
+    accumulated_where_conditions: Tuple[str, ...] = ()
+    is_refinement: bool = False  # True면 이전 WHERE 조건 유지 필요
+    # 대화 기반 맥락 처리용 전체 대화 이력
+    conversation_history: Sequence[ConvEntry] = ()
+
+
+# ============================================
+# 대화 이력 프롬프트 고정 문구
+# ============================================
+
+_SECTION_SEPARATOR = "=" * 50
+
+# 직전 쿼리 SQL의 테이블명 추출
+_FROM_TABLE_RE = re.compile(r'\bFROM\s+(\w+)', re.IGNORECASE)
+
+_LAST_QUERY_SUMMARY_FOOTER = (
+    "",
+    "**현재 질문이 위 결과를 필터링하는 것인지 판단하세요.**",
+    "짧은 필터 표현(예: 'mer_008 가맹점만')은 refinement일 가능성이 높습니다.",
+    _SECTION_SEPARATOR,
+)
+
+_REFINEMENT_CONDITIONS_HEADER = (
+    "### ⚠️ [필수] 이전 WHERE 조건을 반드시 유지하세요",
+    _SECTION_SEPARATOR,
+    "**현재 질문은 이전 결과에 대한 추가 필터링입니다.**",
+    "**아래 조건들을 WHERE 절에 반드시 포함하세요:**",
+    "",
+)
+
+_REFINEMENT_CONDITIONS_FOOTER = (
+    "",
+    "**작성 방법:**",
+    "- 위 조건들을 유지하고, 새 조건을 AND로 추가",
+    "- 예: `WHERE (기존조건1) AND (기존조건2) AND (새조건)`",
+    "- 절대로 기존 조건을 생략하지 마세요!",
+    "",
+    "### 같은 컬럼 조건 처리 - 의도 판단!",
+    "같은 컬럼에 새 조건 추가 시 사용자 표현을 분석:",
+    "- '~이면서/이고/둘다' -> AND로 추가",
+    "- '~또는/이거나' -> OR로 추가",
+    "- '~만/대신/말고' -> 기존 조건 교체",
+    "",
+    "**다른 컬럼** 조건만 무조건 AND로 유지/추가합니다.",
+)
+
+_REFERENCE_CONDITIONS_HEADER = (
+    "### [참고] 전체 대화에서 누적된 WHERE 조건",
+    "-" * 50,
+)
+
+_REFERENCE_CONDITIONS_FOOTER = (
+    "",
+    "**위 조건 사용 여부는 질문 유형에 따라 결정하세요:**",
+    "- new_query: 위 조건 무시, 새로운 WHERE 절 작성",
+    "- refinement: 직전 쿼리의 조건만 유지 + 새 조건 추가",
+)
+
+
+@lru_cache(maxsize=4)
+def _make_llm(provider: str, model: str, api_key: str, max_tokens: int):
+    """
+    Text-to-SQL LLM 클라이언트 생성 (설정 조합별로 워커 내 1회)
+
+    서비스 인스턴스가 여러 개여도 같은 설정이면 클라이언트(HTTP 커넥션 풀 포함)를 공유합니다.
+    """
+    if provider == "anthropic":
+        from langchain_anthropic import ChatAnthropic
+        return ChatAnthropic(
+            model=model,
+            temperature=0,
+            max_tokens=max_tokens,
+            api_key=api_key,
+            # 정적 시스템 프롬프트 캐싱 (cache_control: ephemeral)
+            default_headers={"anthropic-beta": "prompt-caching-2024-07-31"}
+        )
+
+    from langchain_openai import ChatOpenAI
+    return ChatOpenAI(
+        model=model,
+        temperature=0,
+        max_tokens=max_tokens,
+        api_key=api_key,
+        # JSON 모드: 코드 블록/설명 없이 JSON 객체만 반환 → 출력 토큰 감소
+        model_kwargs={"response_format": {"type": "json_object"}}
+    )
+
+
+class TextToSqlService:
+    """
+    Text-to-SQL 서비스
+
+    자연어 질문을 SQL로 변환하고, 읽기 전용 DB에서 실행합니다.
+
+    보안 레이어:
+    1. PostgreSQL 읽기 전용 계정 (DB 레벨)
+    2. SqlValidator (애플리케이션 레벨)
+    3. 실행 제한 (타임아웃, 행 수 제한)
+    """
+
+    def __init__(
+        self,
+        readonly_url: Optional[str] = None,
+        timeout_seconds: int = 30,
+        max_rows: int = 1000,
+        default_limit: int = 1000
+    ):
+        """
+        Args:
+            readonly_url: 읽기 전용 DB 연결 URL
+            timeout_seconds: 쿼리 실행 타임아웃 (초)
+            max_rows: 최대 반환 행 수
+            default_limit: LIMIT 기본값
+        """
+        self.readonly_url = readonly_url or os.getenv(
+            "DATABASE_READONLY_URL",
+            os.getenv("DATABASE_URL")  # 폴백: 기본 DB URL
+        )
+        self.timeout_ms = timeout_seconds * 1000
+        self.max_rows = max_rows
+        self.default_limit = default_limit
+
+        # 세션 설정 (연결 시작 옵션으로 1회 전달 → 쿼리마다 SET 불필요)
+        # - work_mem: 집계/정렬 쿼리가 디스크로 spill 되지 않도록 상향
+        # - idle_in_transaction_session_timeout: 트랜잭션을 연 채 방치된 세션 정리
+        #   (다운로드는 조회 후 파일 생성 동안 트랜잭션이 열려 있으므로 여유 있게 설정)
+        self._connect_options = " ".join([
+            f"-c statement_timeout={self.timeout_ms}",
+            f"-c work_mem={os.getenv('SQL_WORK_MEM', '32MB')}",
+            f"-c idle_in_transaction_session_timeout={os.getenv('SQL_IDLE_IN_TX_TIMEOUT', '60s')}",
+            "-c DateStyle=ISO",
+        ])
+
+        # 읽기 전용 커넥션 풀 (요청마다 TCP/인증 핸드셰이크 생략, 첫 사용 시 생성)
+        self._pool_min_size = int(os.getenv("SQL_POOL_MIN_SIZE", "2"))
+        self._pool_max_size = int(os.getenv("SQL_POOL_MAX_SIZE", "10"))
+        self._pool = None
+        self._pool_unavailable = False
+        self._pool_lock = threading.Lock()
+
+        self.validator = get_sql_validator(max_rows=max_rows, default_limit=default_limit)
+
+        # LLM 설정
+        self._llm_provider = os.getenv("LLM_PROVIDER", "openai").lower()
+        self._llm = None
+        # 응답 토큰 상한 (비정상적으로 긴 생성으로 인한 지연 방지)
+        self._llm_max_tokens = int(os.getenv("LLM_MAX_TOKENS", "1024"))
+
+        # RAG 설정
+        self._rag_enabled = os.getenv("RAG_ENABLED", "true").lower() == "true"
+        self._rag_top_k = int(os.getenv("RAG_TOP_K", "3"))
+        # 이 길이 미만의 짧은 질문(예: "DONE 상태만")은 RAG 조회 생략
+        self._rag_min_question_chars = int(os.getenv("RAG_MIN_QUESTION_CHARS", "10"))
+        # 동일 질문의 RAG 조회 결과 캐시 (TTL 내 재요청 시 임베딩/벡터 검색 생략)
+        self._rag_cache: TtlLruCache[str] = TtlLruCache(
+            max_entries=int(os.getenv("RAG_CACHE_MAX_ENTRIES", "256")),
+            ttl_seconds=float(os.getenv("RAG_CACHE_TTL_SECONDS", "300")),
+        )
+
+        # 동일 질문 + 동일 대화 이력의 최종 응답(조회 데이터 포함) 캐시
+        # 데이터가 TTL 동안 갱신되지 않으므로 기본 비활성화 (RESPONSE_CACHE_TTL_SECONDS > 0으로 활성화)
+        self._response_cache: TtlLruCache[Dict[str, Any]] = TtlLruCache(
+            max_entries=int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "2048")),
+            ttl_seconds=float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "0")),
+        )
+
+        # SQL 실행과 동시에 재시도용 SQL 생성을 미리 시작 (실행 실패 시 LLM 대기 시간 단축)
+        # 실행 성공 시 취소되지만 LLM 호출이 추가로 발생하고, 실제 오류 메시지 없이 생성하므로 기본 비활성화
+        self._speculative_retry_enabled = os.getenv("SQL_SPECULATIVE_RETRY", "false").lower() == "true"
+
+        # 정형 질문 템플릿 매칭 (LLM 호출 생략)
+        self._templates_enabled = os.getenv("SQL_TEMPLATES_ENABLED", "true").lower() == "true"
+
+        # 동일 질문 + 동일 대화 이력의 SQL 생성 결과 캐시 (TTL 내 재요청 시 RAG + LLM 생략)
+        # SQL만 캐싱하고 데이터는 매번 실행하므로 조회 결과는 항상 최신
+        self._sql_cache: TtlLruCache[Tuple[Any, ...]] = TtlLruCache(
+            max_entries=int(os.getenv("SQL_CACHE_MAX_ENTRIES", "1024")),
+            ttl_seconds=float(os.getenv("SQL_CACHE_TTL_SECONDS", "300")),
+        )
+
+    def _get_llm(self):
+        """LLM 인스턴스 지연 초기화"""
+        if self._llm is None:
+            if self._llm_provider == "anthropic":
+                api_key = os.getenv("ANTHROPIC_API_KEY")
+                if not api_key:
+                    raise ValueError("ANTHROPIC_API_KEY is not set")
+                model = os.getenv("LLM_MODEL", "claude-3-5-haiku-20241022")
+            else:
+                api_key = os.getenv("OPENAI_API_KEY")
+                if not api_key:
+                    raise ValueError("OPENAI_API_KEY is not set")
+                model = os.getenv("LLM_MODEL", "gpt-4o-mini")
+            self._llm = _make_llm(self._llm_provider, model, api_key, self._llm_max_tokens)
+            logger.info(f"Text-to-SQL LLM initialized: {self._llm_provider}")
+        return self._llm
+
+    async def warmup(self) -> None:
+        """
+        LLM 클라이언트 사전 초기화 (서버 기동 시 1회)
+
+        첫 질문에서 발생하던 langchain import + 클라이언트 생성 비용과
+        LLM 제공자와의 HTTPS 연결 수립 비용을 기동 시점으로 옮깁니다.
+        실패해도 서비스 기동에는 영향을 주지 않습니다 (첫 요청에서 다시 초기화).
+        """
+        try:
+            llm = self._get_llm()
+            # 1토큰 호출로 커넥션 풀/TLS 세션 확보 (OpenAI JSON 모드는 프롬프트에 "JSON" 필요)
+            await llm.bind(max_tokens=1).ainvoke("Reply with JSON: {}")
+            logger.info("Text-to-SQL LLM warmed up")
+        except Exception as e:
+            logger.warning(f"Text-to-SQL LLM warmup failed: {e}")
+
+    def _get_pool(self):
+        """
+        읽기 전용 커넥션 풀 지연 초기화
+
+        Returns:
+            ConnectionPool 또는 None (psycopg_pool 미설치 시 → 쿼리마다 직접 연결)
+        """
+        if self._pool is not None or self._pool_unavailable:
+            return self._pool
+
+        # execute_sql은 스레드에서 실행되므로 동시 첫 요청에서 풀이 중복 생성되지 않도록 잠금
+        with self._pool_lock:
+            if self._pool is None and not self._pool_unavailable:
+                try:
+                    from psycopg_pool import ConnectionPool
+                except ImportError:
+                    logger.warning("psycopg_pool not installed, using per-query connections")
+                    self._pool_unavailable = True
+                    return None
+
+                self._pool = ConnectionPool(
+                    self.readonly_url,
+                    min_size=self._pool_min_size,
+                    max_size=self._pool_max_size,
+                    kwargs={"row_factory": dict_row, "options": self._connect_options},
+                    # 대여 시 연결 상태 확인 (DB 재시작 등으로 끊긴 연결 재사용 방지)
+                    check=ConnectionPool.check_connection,
+                    name="text-to-sql-readonly",
+                    open=True,
+                )
+                logger.info(
+                    f"Read-only connection pool opened (min={self._pool_min_size}, max={self._pool_max_size})"
+                )
+
+        return self._pool
+
+    def _get_readonly_connection(self):
+        """
+        읽기 전용 DB 연결
+
+        커넥션 풀 사용 시 with 블록 종료 후 트랜잭션을 정리하고 풀에 반환합니다.
+        """
+        if not self.readonly_url:
+            raise ValueError("DATABASE_READONLY_URL is not set")
+
+        pool = self._get_pool()
+        if pool is not None:
+            return pool.connection()
+
+        return psycopg.connect(
+            self.readonly_url,
+            row_factory=dict_row,
+            options=self._connect_options
+        )
+
+    def _get_download_connection(self):
+        """
+        다운로드 전용 읽기 전용 DB 연결 (요청마다 새로 연결)
+
+        다운로드는 클라이언트 전송이 끝날 때까지 연결을 점유하므로
+        대화형 query()가 사용하는 커넥션 풀과 분리합니다.
+        """
+        if not self.readonly_url:
+            raise ValueError("DATABASE_READONLY_URL is not set")
+
+        return psycopg.connect(
+            self.readonly_url,
+            row_factory=dict_row,
+            options=self._connect_options
+        )
+
+    def close(self):
+        """커넥션 풀 종료 (서버 종료 시 호출)"""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.close()
+                self._pool = None
+                logger.info("Read-only connection pool closed")
+
+    async def _get_rag_context(self, question: str) -> str:
+        """RAG 컨텍스트 조회"""
+        if not self._rag_enabled:
+            return ""
+
+        # 도메인 키워드 없는 짧은 필터성 질문("DONE만" 등)은 문서 참조 효과가 낮으므로
+        # 임베딩 + 벡터 검색 생략 (짧아도 "환불율 알려줘"처럼 용어 정의가 필요한 질문은 조회)
+        if len(question.strip()) < self._rag_min_question_chars and not _has_domain_keyword(question):
+            logger.info(f"RAG context skipped for short question: {question!r}")
+            return ""
+
+        # 동일 질문(공백/대소문자 정규화) 재요청 시 임베딩 + 벡터 검색 생략
+        cache_key = " ".join(question.lower().split())
+        cached = self._rag_cache.get(cache_key)
+        if cached is not None:
+            logger.info("RAG context served from cache")
+            return cached
+
+        try:
+            rag_service = get_rag_service()
+            # search_docs() 메서드 사용 (search()는 존재하지 않음)
+            results = await rag_service.search_docs(query=question, k=self._rag_top_k)
+
+            context_parts = []
+            for doc in results or []:
+                # Document 객체의 속성 접근
+                context_parts.append(f"[{doc.doc_type}] {doc.title}: {doc.content[:500]}")
+
+            context = "\n\n".join(context_parts)
+            # 조회 성공 결과만 캐싱 (문서 없음 포함, 오류는 캐싱하지 않음)
+            self._rag_cache.set(cache_key, context)
+
+            if results:
+                logger.info(f"RAG context retrieved: {len(results)} documents")
+            return context
+        except Exception as e:
+            logger.warning(f"RAG context retrieval failed: {e}")
+            return ""
+
+    def _build_prompt(
+        self,
+        question: str,
+        conversation_context: Optional[ConversationContext] = None,
+        rag_context: str = ""
+    ) -> str:
+        """
+        SQL 생성 프롬프트 구성
+
+        대화 기반 맥락 처리 방식:
+        - 규칙 기반 강제 대신 자연스러운 대화 흐름으로 컨텍스트 전달
+        - Claude Code처럼 대화 이력을 명확하게 보여주어 LLM이 맥락을 이해하도록 함
+
+        정적 영역(대화 상태별 변형) + 동적 영역을 하나의 문자열로 반환합니다.
+        실제 LLM 호출은 _build_prompt_messages()로 두 영역을 분리해 전송합니다.
+        """
+        static_prefix = _select_static_prompt_prefix(conversation_context)
+        return f"{static_prefix}\n{self._build_dynamic_prompt(question, conversation_context, rag_context)}"
+
+    def _build_dynamic_prompt(
+        self,
+        question: str,
+        conversation_context: Optional[ConversationContext] = None,
+        rag_context: str = ""
+    ) -> str:
+        """
+        요청마다 달라지는 프롬프트 영역 구성
+
+        현재 날짜(시간 조회 규칙), RAG 컨텍스트, 대화 이력, 현재 질문을 담으며
+        정적 프롬프트(_STATIC_PROMPT_PREFIX) 뒤에 위치합니다.
+        """
+        # 현재 날짜 정보 + 시간 조회 규칙 (날짜가 바뀌므로 정적 영역에서 분리, 날짜별 캐싱)
+        date_block = _build_date_prompt_block(datetime.now().strftime('%Y-%m-%d'))
+
+        # RAG 컨텍스트
+        rag_block = f"\n\n## 참고 문서\n{rag_context}" if rag_context else ""
+
+        # 대화 기반 컨텍스트 (자연스러운 대화 형태)
+        conv_block = ""
+        if conversation_context and conversation_context.conversation_history:
+            conv_block = f"\n{self._build_conversation_flow(conversation_context)}"
 
         # 현재 질문
-        prompt_parts.append(f"\n## 현재 질문\n{question}")
+        return f"{date_block}{rag_block}{conv_block}\n\n## 현재 질문\n{question}"
 
-        return "\n".join(prompt_parts)
+    def _build_prompt_messages(
+        self,
+        question: str,
+        conversation_context: Optional[ConversationContext] = None,
+        rag_context: str = ""
+    ) -> list:
+        """
+        LLM 호출용 메시지 구성 (프롬프트 캐싱 대응)
+
+        - SystemMessage: 정적 프롬프트 (규칙 + 패턴 가이드 + 스키마). 대화 상태별 변형마다 바이트 단위로 동일
+          - Anthropic: cache_control(ephemeral) 블록으로 전송하여 프롬프트 캐시 적중
+          - OpenAI: 동일 prefix가 앞에 오므로 자동 prefix 캐싱 적용
+        - HumanMessage: 날짜, RAG, 대화 이력, 현재 질문 등 동적 영역
+        """
+        from langchain_core.messages import SystemMessage, HumanMessage
+
+        static_prefix = _select_static_prompt_prefix(conversation_context)
+        if self._llm_provider == "anthropic":
+            system_content = [{
+                "type": "text",
+                "text": static_prefix,
+                "cache_control": {"type": "ephemeral"}
+            }]
+        else:
+            system_content = static_prefix
+
+        return [
+            SystemMessage(content=system_content),
+            HumanMessage(content=self._build_dynamic_prompt(question, conversation_context, rag_context))
+        ]
+
+    def _build_retry_messages(
+        self,
+        messages: List[Any],
+        previous_sql: str,
+        error: Optional[str]
+    ) -> List[Any]:
+        """
+        SQL 실행 오류 시 재시도용 메시지 구성
+
+        최초 요청 메시지를 그대로 두고 이전 SQL(assistant)과 오류 힌트(human)만
+        덧붙여, RAG 재조회와 프롬프트 재구성 없이 캐시된 접두부를 재사용합니다.
+        """
+        from langchain_core.messages import AIMessage, HumanMessage
+
+        # error가 없으면(실행 결과 전 미리 생성하는 경우) 일반 재시도 힌트 사용
+        error_hint = f"이전 SQL 오류: {error}. " if error else "이전 SQL 실행이 실패했습니다. "
+        return messages + [
+            AIMessage(content=previous_sql),
+            HumanMessage(content=(
+                f"{error_hint}"
+                "같은 테이블에서 SQL 구문만 수정하세요. 다른 테이블로 변경하지 마세요. "
+                "응답은 동일한 JSON 형식으로 작성하세요."
+            )),
+        ]
 
     def _build_conversation_flow(self, context: ConversationContext) -> str:
         """
@@ -1206,42 +1926,39 @@ SQL을 생성하기 전에, 먼저 사용자 질문이 다음 중 어떤 유형
         parts = ["\n## 대화 이력"]
         turn_number = 1
         last_sql = None
-        last_where_conditions = []
-        last_table = None
+        last_where_conditions: Sequence[str] = ()
 
         for entry in context.conversation_history:
-            role = entry.get("role", "")
-            content = entry.get("content", "")
-            sql = entry.get("sql")
-            row_count = entry.get("rowCount")
-            where_conditions = entry.get("whereConditions", [])
-
-            if role == "user":
-                parts.append(f"\n[{turn_number}] User: {content}")
-            elif role == "assistant" and sql:
+            sql = entry.sql
+
+            if entry.role == "user":
+                parts.append(f"\n[{turn_number}] User: {entry.content}")
+            elif entry.role == "assistant" and sql:
                 # SQL과 결과 건수를 함께 표시
+                row_count = entry.row_count
                 result_info = f"결과: {row_count}건" if row_count is not None else "결과: 있음"
                 parts.append(f"    -> SQL: {sql}")
                 parts.append(f"    -> {result_info}")
                 # Phase 4: WHERE 조건도 각 턴별로 표시 (LLM이 조건 흐름을 추적하도록)
+                where_conditions = entry.where_conditions
                 if where_conditions:
-                    parts.append(f"    -> WHERE 조건: {where_conditions}")
+                    parts.append(f"    -> WHERE 조건: {list(where_conditions)}")
                 turn_number += 1
-                # 직전 쿼리 정보 저장
+                # 직전 쿼리 정보 저장 (조건/테이블 추출은 루프 종료 후 직전 쿼리에 대해서만 수행)
                 last_sql = sql
-                last_where_conditions = where_conditions if where_conditions else extract_where_conditions(sql)
-                # 테이블명 추출
-                table_match = re.search(r'\bFROM\s+(\w+)', sql, re.IGNORECASE)
-                if table_match:
-                    last_table = table_match.group(1)
+                last_where_conditions = where_conditions
 
         # Phase 5 (TC-005): 직전 쿼리 정보를 별도 섹션으로 강조
         if last_sql:
-            parts.append("\n" + "=" * 50)
+            if not last_where_conditions:
+                last_where_conditions = extract_where_conditions(last_sql)
+            table_match = _FROM_TABLE_RE.search(last_sql)
+
+            parts.append("\n" + _SECTION_SEPARATOR)
             parts.append("## 직전 쿼리 요약 (refinement 판단용)")
-            parts.append("=" * 50)
-            if last_table:
-                parts.append(f"- 테이블: {last_table}")
+            parts.append(_SECTION_SEPARATOR)
+            if table_match:
+                parts.append(f"- 테이블: {table_match.group(1)}")
             if last_where_conditions:
                 parts.append("- WHERE 조건:")
                 for cond in last_where_conditions:
@@ -1250,49 +1967,30 @@ SQL을 생성하기 전에, 먼저 사용자 질문이 다음 중 어떤 유형
                     parts.append(f"  * {humanized} (`{cond}`)")
             else:
                 parts.append("- WHERE 조건: 없음")
-            parts.append("")
-            parts.append("**현재 질문이 위 결과를 필터링하는 것인지 판단하세요.**")
-            parts.append("짧은 필터 표현(예: 'mer_008 가맹점만')은 refinement일 가능성이 높습니다.")
-            parts.append("=" * 50)
+            parts.extend(_LAST_QUERY_SUMMARY_FOOTER)
 
         # Phase 5: 누적된 WHERE 조건 처리 (is_refinement 여부에 따라 강제/참고)
         if context.accumulated_where_conditions:
-            parts.append("\n" + "=" * 50)
+            parts.append("\n" + _SECTION_SEPARATOR)
 
             if context.is_refinement:
                 # TC-005: 암시적 참조 감지 시 이전 조건 강제 포함
-                parts.append("### ⚠️ [필수] 이전 WHERE 조건을 반드시 유지하세요")
-                parts.append("=" * 50)
-                parts.append("**현재 질문은 이전 결과에 대한 추가 필터링입니다.**")
-                parts.append("**아래 조건들을 WHERE 절에 반드시 포함하세요:**")
-                parts.append("")
-                for i, cond in enumerate(context.accumulated_where_conditions, 1):
-                    parts.append(f"  {i}. `{cond}` ← 필수")
-                parts.append("")
-                parts.append("**작성 방법:**")
-                parts.append("- 위 조건들을 유지하고, 새 조건을 AND로 추가")
-                parts.append("- 예: `WHERE (기존조건1) AND (기존조건2) AND (새조건)`")
-                parts.append("- 절대로 기존 조건을 생략하지 마세요!")
-                parts.append("")
-                parts.append("### 같은 컬럼 조건 처리 - 의도 판단!")
-                parts.append("같은 컬럼에 새 조건 추가 시 사용자 표현을 분석:")
-                parts.append("- '~이면서/이고/둘다' -> AND로 추가")
-                parts.append("- '~또는/이거나' -> OR로 추가")
-                parts.append("- '~만/대신/말고' -> 기존 조건 교체")
-                parts.append("")
-                parts.append("**다른 컬럼** 조건만 무조건 AND로 유지/추가합니다.")
+                parts.extend(_REFINEMENT_CONDITIONS_HEADER)
+                parts.extend(
+                    f"  {i}. `{cond}` ← 필수"
+                    for i, cond in enumerate(context.accumulated_where_conditions, 1)
+                )
+                parts.extend(_REFINEMENT_CONDITIONS_FOOTER)
             else:
                 # 기존 로직: 참고용으로 표시
-                parts.append("### [참고] 전체 대화에서 누적된 WHERE 조건")
-                parts.append("-" * 50)
-                for i, cond in enumerate(context.accumulated_where_conditions, 1):
-                    parts.append(f"  {i}. `{cond}`")
-                parts.append("")
-                parts.append("**위 조건 사용 여부는 질문 유형에 따라 결정하세요:**")
-                parts.append("- new_query: 위 조건 무시, 새로운 WHERE 절 작성")
-                parts.append("- refinement: 직전 쿼리의 조건만 유지 + 새 조건 추가")
+                parts.extend(_REFERENCE_CONDITIONS_HEADER)
+                parts.extend(
+                    f"  {i}. `{cond}`"
+                    for i, cond in enumerate(context.accumulated_where_conditions, 1)
+                )
+                parts.extend(_REFERENCE_CONDITIONS_FOOTER)
 
-            parts.append("=" * 50)
+            parts.append(_SECTION_SEPARATOR)
 
         return "\n".join(parts)
 
@@ -1306,55 +2004,45 @@ SQL을 생성하기 전에, 먼저 사용자 질문이 다음 중 어떤 유형
         Returns:
             (sql, chart_type, chart_reason, insight_template, summary_stats_template) 튜플
         """
-        # JSON 블록 추출 시도
-        json_match = re.search(r'```json\s*(.*?)\s*```', raw_response, re.DOTALL)
-        if json_match:
+        # 파싱 후보: 응답 전체(코드 블록 없이 JSON만 반환된 경우) 또는 ```json 블록
+        # JSON 모드(OpenAI) 응답은 JSON 객체만 오므로 응답 전체를 먼저 시도
+        # '{'로 시작하지 않는 응답은 전체를 JSON 객체로 파싱할 수 없으므로 시도하지 않음
+        if raw_response.lstrip().startswith("{"):
+            candidates = [("direct JSON", raw_response)]
+        else:
+            json_match = _JSON_BLOCK_RE.search(raw_response)
+            candidates = [("JSON block", json_match.group(1))] if json_match else []
+
+        for source, candidate in candidates:
             try:
-                data = json.loads(json_match.group(1))
-                sql = data.get("sql", "").strip()
-                chart_type = data.get("chartType")
-                chart_reason = data.get("chartReason")
-                insight_template = data.get("insightTemplate")
-                summary_stats_template = data.get("summaryStatsTemplate")
-                logger.info(f"Parsed JSON response - chartType: {chart_type}, reason: {chart_reason}, insightTemplate: {insight_template is not None}, summaryStatsTemplate: {summary_stats_template is not None}")
-                return (sql, chart_type, chart_reason, insight_template, summary_stats_template)
+                data = _json_loads(candidate)
             except json.JSONDecodeError as e:
-                logger.warning(f"Failed to parse JSON block: {e}")
+                if source == "JSON block":
+                    logger.warning(f"Failed to parse JSON block: {e}")
+                continue
+            if not isinstance(data, dict):
+                continue
 
-        # JSON 직접 파싱 시도 (코드 블록 없이 JSON만 반환된 경우)
-        try:
-            data = json.loads(raw_response)
             sql = data.get("sql", "").strip()
             chart_type = data.get("chartType")
             chart_reason = data.get("chartReason")
             insight_template = data.get("insightTemplate")
             summary_stats_template = data.get("summaryStatsTemplate")
-            logger.info(f"Parsed direct JSON - chartType: {chart_type}, reason: {chart_reason}, insightTemplate: {insight_template is not None}, summaryStatsTemplate: {summary_stats_template is not None}")
+            logger.info(f"Parsed {source} response - chartType: {chart_type}, reason: {chart_reason}, insightTemplate: {insight_template is not None}, summaryStatsTemplate: {summary_stats_template is not None}")
             return (sql, chart_type, chart_reason, insight_template, summary_stats_template)
-        except json.JSONDecodeError:
-            pass
 
         # 폴백: 기존 방식 (SQL만 추출)
         logger.warning("Failed to parse JSON response, falling back to SQL-only extraction")
-        sql = raw_response
-        if sql.startswith("```"):
-            lines = sql.split("\n")
-            sql_lines = []
-            in_block = False
-            for line in lines:
-                if line.startswith("```"):
-                    in_block = not in_block
-                    continue
-                if in_block or not line.startswith("```"):
-                    sql_lines.append(line)
-            sql = "\n".join(sql_lines).strip()
+        sql = _CODE_FENCE_RE.sub("", raw_response)
 
         return (sql.strip(), None, None, None, None)
 
     async def generate_sql(
         self,
         question: str,
-        conversation_context: Optional[ConversationContext] = None
+        conversation_context: Optional[ConversationContext] = None,
+        rag_context: Optional[str] = None,
+        messages: Optional[List[Any]] = None
     ) -> Tuple[str, ValidationResult, Optional[str], Optional[str], Optional[List[Dict[str, Any]]]]:
         """
         자연어를 SQL로 변환
@@ -1362,22 +2050,34 @@ SQL을 생성하기 전에, 먼저 사용자 질문이 다음 중 어떤 유형
         Args:
             question: 사용자 질문
             conversation_context: 연속 대화 컨텍스트
+            rag_context: 미리 조회한 RAG 컨텍스트 (None이면 여기서 조회)
+            messages: 미리 구성한 LLM 메시지 (지정 시 RAG 조회/프롬프트 구성 생략)
 
         Returns:
             (생성된 SQL, 검증 결과, 추천 차트 타입, 인사이트 템플릿, summaryStats 템플릿) 튜플
         """
-        # RAG 컨텍스트 조회
-        rag_context = await self._get_rag_context(question)
+        if messages is None:
+            # RAG 컨텍스트 조회 (호출측에서 미리 조회하지 않은 경우)
+            if rag_context is None:
+                rag_context = await self._get_rag_context(question)
 
-        # 프롬프트 구성
-        prompt = self._build_prompt(question, conversation_context, rag_context)
+            # 프롬프트 구성 (정적 system + 동적 human 메시지 분리 → 프롬프트 캐싱)
+            messages = self._build_prompt_messages(question, conversation_context, rag_context)
 
-        # LLM 호출
+        # LLM 호출 (스트리밍: sql 필드가 완성되면 나머지 필드 생성 중에 미리 검증)
         llm = self._get_llm()
-        response = await llm.ainvoke(prompt)
+        chunks: List[str] = []
+        early_sql: Optional[str] = None
+        early_validation: Optional[ValidationResult] = None
+        async for chunk in llm.astream(messages):
+            chunks.append(chunk.content)
+            if early_sql is None:
+                early_sql = _extract_streamed_sql("".join(chunks))
+                if early_sql is not None:
+                    early_validation = self.validator.validate(early_sql.strip())
 
         # JSON 응답 파싱 (SQL + 차트 타입 + 인사이트 템플릿 + summaryStats 템플릿)
-        raw_response = response.content.strip()
+        raw_response = "".join(chunks).strip()
         raw_sql, chart_type, chart_reason, insight_template, summary_stats_template = self._parse_llm_response(raw_response)
 
         logger.info(f"Generated SQL: {raw_sql[:200]}...")
@@ -1388,8 +2088,11 @@ SQL을 생성하기 전에, 먼저 사용자 질문이 다음 중 어떤 유형
         if summary_stats_template:
             logger.info(f"LLM summaryStats template: {len(summary_stats_template)} items")
 
-        # SQL 검증
-        validation_result = self.validator.validate(raw_sql)
+        # SQL 검증 (스트리밍 중 검증한 SQL과 최종 파싱 결과가 같으면 재사용)
+        if early_validation is not None and early_sql.strip() == raw_sql:
+            validation_result = early_validation
+        else:
+            validation_result = self.validator.validate(raw_sql)
 
         return raw_sql, validation_result, chart_type, insight_template, summary_stats_template
 
@@ -1410,19 +2113,30 @@ SQL을 생성하기 전에, 먼저 사용자 질문이 다음 중 어떤 유형
         Returns:
             COUNT(*) 래핑된 SQL 문자열
         """
-        # LIMIT/OFFSET 제거
-        count_sql = re.sub(r'\bLIMIT\s+\d+', '', sql, flags=re.IGNORECASE)
-        count_sql = re.sub(r'\bOFFSET\s+\d+', '', count_sql, flags=re.IGNORECASE)
-
-        # ORDER BY 제거 (COUNT에서 불필요)
-        count_sql = re.sub(r'\bORDER\s+BY\s+[^)]+$', '', count_sql, flags=re.IGNORECASE)
-
         # 서브쿼리 래핑 전 끝의 세미콜론 제거
         # CTE SQL 등에서 `;`가 포함되면 서브쿼리 내부에 남아 PostgreSQL 구문 오류 발생
-        count_sql = count_sql.strip().rstrip(';').strip()
+        count_sql = sql.strip().rstrip(';').strip()
+
+        # 메인 쿼리 끝의 LIMIT/OFFSET만 제거
+        # (CTE/서브쿼리 내부의 LIMIT은 "상위 N개" 의미이므로 유지해야 건수가 정확함)
+        count_sql = _TRAILING_LIMIT_OFFSET_RE.sub('', count_sql)
+
+        # ORDER BY 제거 (COUNT에서 불필요)
+        count_sql = _TRAILING_ORDER_BY_RE.sub('', count_sql).strip()
 
         return f"SELECT COUNT(*) as cnt FROM ({count_sql}) sub"
 
+    @staticmethod
+    def _get_outer_limit(sql: str) -> Optional[int]:
+        """
+        메인 쿼리 끝의 LIMIT 값 추출 (CTE/서브쿼리 내부 LIMIT은 무시)
+
+        Returns:
+            LIMIT 값 또는 None (메인 쿼리에 LIMIT이 없는 경우)
+        """
+        match = _TRAILING_LIMIT_RE.search(sql)
+        return int(match.group(1)) if match else None
+
     def _get_count(self, sql: str) -> int:
         """
         원본 SQL을 COUNT 쿼리로 변환하여 전체 건수 확인
@@ -1447,13 +2161,47 @@ SQL을 생성하기 전에, 먼저 사용자 질문이 다음 중 어떤 유형
             logger.warning(f"COUNT query failed, returning 0: {e}")
             return 0
 
+    def _fetch_rows(self, sql: str, max_rows: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        검증된 SQL 실행 후 행 반환 (dict_row)
+
+        Args:
+            sql: 실행할 SQL
+            max_rows: 최대 행 수 (지정 시 그 이상은 행 객체로 만들지 않음)
+        """
+        with self._get_readonly_connection() as conn:
+            with conn.cursor() as cur:
+                # timestamp 컬럼은 DB 텍스트 출력을 그대로 ISO 문자열로 로드
+                # (행마다 datetime 생성 후 isoformat() 하는 후처리 루프 제거)
+                cur.adapters.register_loader("timestamp", _IsoTimestampLoader)
+                cur.adapters.register_loader("timestamptz", _IsoTimestamptzLoader)
+                cur.execute(sql)
+
+                # dict_row 사용으로 이미 딕셔너리 형태
+                # LIMIT 교체가 적용되지 않는 구문(FETCH FIRST 등)에서도 행 수/메모리 상한 보장
+                return cur.fetchmany(max_rows) if max_rows is not None else cur.fetchall()
+
+    @staticmethod
+    def _build_probe_sql(sql: str, limit: int) -> str:
+        """
+        메인 쿼리의 LIMIT을 지정 값으로 교체 (없으면 추가)
+
+        잘림 여부 확인용으로 max_rows + 1건만 조회할 때 사용합니다.
+        CTE/서브쿼리 내부의 LIMIT은 그대로 유지합니다.
+        """
+        match = _TRAILING_LIMIT_RE.search(sql)
+        if match:
+            return f"{sql[:match.start(1)]}{limit}{sql[match.end(1):]}"
+        return f"{sql.strip().rstrip(';').rstrip()} LIMIT {limit}"
+
     def execute_sql(self, sql: str) -> SqlResult:
         """
         SQL 실행 (동기)
 
-        1. 먼저 COUNT 쿼리로 전체 건수 확인
-        2. max_rows 초과 시 데이터 조회 스킵 (다운로드로 유도)
-        3. max_rows 이하면 데이터 조회
+        1. max_rows + 1건까지만 조회하여 잘림 여부 판단 (COUNT 쿼리 없이)
+           (사용자 지정 LIMIT이 max_rows 미만이면 잘릴 수 없으므로 원본 그대로 조회)
+        2. max_rows 초과 시에만 COUNT 쿼리로 전체 건수 확인 후 데이터 없이 반환 (다운로드로 유도)
+        3. max_rows 이하면 조회 데이터와 행 수(= 전체 건수) 반환
 
         Args:
             sql: 실행할 SQL (검증 완료된 것)
@@ -1465,14 +2213,20 @@ SQL을 생성하기 전에, 먼저 사용자 질문이 다음 중 어떤 유형
         start_time = time.time()
 
         try:
-            # 1. 먼저 COUNT 쿼리로 전체 건수 확인
-            total_count = self._get_count(sql)
-            logger.info(f"Total count: {total_count}, max_rows: {self.max_rows}")
+            # "10건만" 등 사용자 지정 LIMIT이 max_rows 미만이면 결과가 잘릴 수 없으므로 그대로 조회
+            # (LIMIT == max_rows는 Validator가 붙인 기본 LIMIT일 수 있으므로 1건 더 조회해 확인)
+            outer_limit = self._get_outer_limit(sql)
+            if outer_limit is not None and outer_limit < self.max_rows:
+                data = self._fetch_rows(sql)
+            else:
+                probe_rows = self.max_rows + 1
+                data = self._fetch_rows(self._build_probe_sql(sql, probe_rows), max_rows=probe_rows)
 
-            # 2. max_rows 초과면 데이터 조회 스킵 (다운로드로 유도)
-            if total_count > self.max_rows:
+            # max_rows 초과 시에만 전체 건수 COUNT (잘리지 않는 대부분의 쿼리는 COUNT 생략)
+            if len(data) > self.max_rows:
+                total_count = self._get_count(sql)
                 execution_time_ms = (time.time() - start_time) * 1000
-                logger.info(f"Data exceeds max_rows ({total_count} > {self.max_rows}), skipping data fetch")
+                logger.info(f"Data exceeds max_rows ({total_count} > {self.max_rows}), skipping data")
 
                 return SqlResult(
                     success=True,
@@ -1484,34 +2238,18 @@ SQL을 생성하기 전에, 먼저 사용자 질문이 다음 중 어떤 유형
                     is_truncated=True               # 잘림 표시
                 )
 
-            # 3. max_rows 이하면 기존대로 실행
-            with self._get_readonly_connection() as conn:
-                with conn.cursor() as cur:
-                    cur.execute(sql)
-                    rows = cur.fetchall()
-
-                    execution_time_ms = (time.time() - start_time) * 1000
-
-                    # dict_row 사용으로 이미 딕셔너리 형태
-                    data = [dict(row) for row in rows]
-
-                    # datetime 객체를 ISO 문자열로 변환
-                    for row in data:
-                        for key, value in row.items():
-                            if isinstance(value, datetime):
-                                row[key] = value.isoformat()
-
-                    logger.info(f"SQL executed: {len(data)} rows in {execution_time_ms:.1f}ms")
-
-                    return SqlResult(
-                        success=True,
-                        data=data,
-                        row_count=len(data),
-                        sql=sql,
-                        execution_time_ms=execution_time_ms,
-                        total_count=total_count,    # 전체 건수
-                        is_truncated=False
-                    )
+            execution_time_ms = (time.time() - start_time) * 1000
+            logger.info(f"SQL executed: {len(data)} rows in {execution_time_ms:.1f}ms")
+
+            return SqlResult(
+                success=True,
+                data=data,
+                row_count=len(data),
+                sql=sql,
+                execution_time_ms=execution_time_ms,
+                total_count=len(data),      # 잘리지 않았으므로 조회 행 수가 곧 전체 건수
+                is_truncated=False
+            )
 
         except psycopg.Error as e:
             execution_time_ms = (time.time() - start_time) * 1000
@@ -1525,6 +2263,36 @@ SQL을 생성하기 전에, 먼저 사용자 질문이 다음 중 어떤 유형
                 execution_time_ms=execution_time_ms
             )
 
+    @staticmethod
+    def _sql_cache_key(
+        question: str,
+        conversation_history: Optional[List[Dict[str, Any]]],
+        is_refinement: bool
+    ) -> str:
+        """
+        SQL 생성 캐시 키 (질문 + 날짜 + refinement 여부 + 대화 이력)
+
+        프롬프트에 들어가는 입력이 같으면 같은 키가 되도록 구성합니다.
+        - 날짜: "오늘" 등 상대 시간 질문이 날짜가 바뀐 뒤 재사용되지 않도록 포함
+        - 대화 이력: 프롬프트/응답이 읽는 필드 전부 사용
+          (역할/내용/SQL/결과 건수/WHERE 조건 - 이전 결과가 다르면 다른 키)
+        """
+        parts = [
+            " ".join(question.split()),
+            datetime.now().strftime('%Y-%m-%d'),
+            str(is_refinement),
+        ]
+        for msg in conversation_history or []:
+            parts.append(str(msg.get("role", "")))
+            parts.append(str(msg.get("content", "")))
+            parts.append(str(msg.get("sql") or ""))
+            # 결과 건수: 대화 흐름("결과: N건")과 이전 결과 요약, aggregationContext.sourceRowCount에 반영
+            parts.append(str(msg.get("rowCount")))
+            parts.append(str(msg.get("totalCount")))
+            parts.append("\x1e".join(msg.get("whereConditions") or ()))
+
+        return hashlib.blake2b("\x1f".join(parts).encode(), digest_size=16).hexdigest()
+
     async def query(
         self,
         question: str,
@@ -1551,14 +2319,57 @@ SQL을 생성하기 전에, 먼저 사용자 질문이 다음 중 어떤 유형
                 "executionTimeMs": float
             }
         """
-        # 대화 컨텍스트 구성 (is_refinement 전달)
-        conversation_context = self._build_conversation_context(
-            conversation_history,
-            is_refinement=is_refinement
-        )
+        cache_key = self._sql_cache_key(question, conversation_history, is_refinement)
+
+        # 동일 질문/대화 이력의 최근 응답 재사용 (응답 캐시 활성화 시, 생성 + 실행 모두 생략)
+        cached_response = self._response_cache.get(cache_key)
+        if cached_response is not None:
+            logger.info(f"Query served from response cache: {cached_response['sql'][:200]}")
+            # data/aggregationContext 등 중첩 객체를 호출자 간에 공유하지 않도록 복사본 반환
+            response = copy.deepcopy(cached_response)
+            response["llmSkipped"] = True
+            return response
+
+        # 정형 질문 템플릿 매칭 (이전 결과를 좁히는 refinement 질문은 제외)
+        template_match = None
+        if self._templates_enabled and not is_refinement:
+            template_match = match_sql_template(question)
+
+        # 동일 질문/대화 이력의 이전 생성 결과 조회
+        cached_generation = None
+        if not template_match:
+            cached_generation = self._sql_cache.get(cache_key)
+
+        messages = None
+        if template_match:
+            template_name, raw_sql = template_match
+            logger.info(f"LLM skipped by SQL template '{template_name}': {raw_sql}")
+            validation_result = self.validator.validate(raw_sql)
+            llm_chart_type, insight_template, summary_stats_template = None, None, None
+        elif cached_generation is not None:
+            raw_sql, validation_result, llm_chart_type, insight_template, summary_stats_template = cached_generation
+            logger.info(f"LLM skipped by SQL cache: {raw_sql[:200]}")
+        else:
+            # RAG 조회와 대화 컨텍스트 구성(is_refinement 전달)은 서로 독립적이므로 동시 실행
+            # - RAG: 임베딩 + 벡터 검색 (내부적으로 스레드에서 실행)
+            # - 대화 컨텍스트: 이력 전체의 WHERE 조건 추출/병합 (CPU 작업이므로 스레드에서 실행)
+            rag_context, conversation_context = await asyncio.gather(
+                self._get_rag_context(question),
+                asyncio.to_thread(
+                    self._build_conversation_context,
+                    conversation_history,
+                    is_refinement=is_refinement
+                )
+            )
 
-        # SQL 생성 (차트 타입 + 인사이트 템플릿 + summaryStats 템플릿 포함)
-        raw_sql, validation_result, llm_chart_type, insight_template, summary_stats_template = await self.generate_sql(question, conversation_context)
+            # 프롬프트 메시지 구성 (재시도 시 그대로 재사용)
+            messages = self._build_prompt_messages(question, conversation_context, rag_context)
+
+            # SQL 생성 (차트 타입 + 인사이트 템플릿 + summaryStats 템플릿 포함)
+            raw_sql, validation_result, llm_chart_type, insight_template, summary_stats_template = await self.generate_sql(
+                question, messages=messages
+            )
+        llm_skipped = template_match is not None or cached_generation is not None
 
         if not validation_result.is_valid:
             return {
@@ -1570,29 +2381,53 @@ SQL을 생성하기 전에, 먼저 사용자 질문이 다음 중 어떤 유형
                 "executionTimeMs": 0,
                 "llmChartType": llm_chart_type,  # 검증 실패 시에도 차트 타입 포함
                 "insightTemplate": insight_template,  # 검증 실패 시에도 인사이트 템플릿 포함
-                "summaryStatsTemplate": summary_stats_template  # 검증 실패 시에도 summaryStats 템플릿 포함
+                "summaryStatsTemplate": summary_stats_template,  # 검증 실패 시에도 summaryStats 템플릿 포함
+                "llmSkipped": llm_skipped
             }
 
-        # SQL 실행
-        result = self.execute_sql(validation_result.sanitized_sql)
+        # 템플릿 SQL은 LLM 메시지가 없으므로 재시도 대상에서 제외
+        can_retry = retry_on_error and messages is not None
 
-        if not result.success and retry_on_error:
-            # 에러 시 재시도 (에러 메시지를 컨텍스트에 포함)
-            logger.info(f"Retrying SQL generation with error context: {result.error}")
+        # 재시도용 SQL 생성을 실행과 동시에 미리 시작 (SQL_SPECULATIVE_RETRY, 실행 성공 시 취소)
+        speculative_retry = None
+        if can_retry and self._speculative_retry_enabled:
+            speculative_retry = asyncio.create_task(self.generate_sql(
+                question, messages=self._build_retry_messages(messages, raw_sql, None)
+            ))
 
-            retry_context = ConversationContext(
-                previous_question=question,
-                previous_sql=raw_sql,
-                previous_result_summary=f"ERROR: {result.error}"
-            )
+        # SQL 실행 (동기 DB 호출이 이벤트 루프를 막지 않도록 스레드에서 실행)
+        try:
+            result = await asyncio.to_thread(self.execute_sql, validation_result.sanitized_sql)
+        except BaseException:
+            if speculative_retry is not None:
+                speculative_retry.cancel()
+            raise
+
+        if speculative_retry is not None and result.success:
+            speculative_retry.cancel()
+
+        retried = not result.success and can_retry
+        if retried:
+            # 에러 시 재시도 (최초 메시지에 오류 턴만 추가, RAG/프롬프트 재구성 생략)
+            if speculative_retry is not None:
+                logger.info(f"Using speculative SQL retry after error: {result.error}")
+                retry_generation = await speculative_retry
+            else:
+                logger.info(f"Retrying SQL generation with error context: {result.error}")
+                retry_messages = self._build_retry_messages(messages, raw_sql, result.error)
+                retry_generation = await self.generate_sql(question, messages=retry_messages)
 
-            raw_sql, validation_result, llm_chart_type, insight_template, summary_stats_template = await self.generate_sql(
-                f"{question}\n\n(이전 SQL 오류: {result.error}. 같은 테이블에서 SQL 구문만 수정하세요. 다른 테이블로 변경하지 마세요.)",
-                retry_context
-            )
+            raw_sql, validation_result, llm_chart_type, insight_template, summary_stats_template = retry_generation
 
             if validation_result.is_valid:
-                result = self.execute_sql(validation_result.sanitized_sql)
+                result = await asyncio.to_thread(self.execute_sql, validation_result.sanitized_sql)
+
+        # 실행에 성공한 LLM 생성 결과만 캐싱
+        if not template_match and cached_generation is None and result.success and validation_result.is_valid:
+            self._sql_cache.set(
+                cache_key,
+                (raw_sql, validation_result, llm_chart_type, insight_template, summary_stats_template)
+            )
 
         # 집계 컨텍스트 생성 (집계 쿼리인 경우에만)
         aggregation_context = None
@@ -1608,7 +2443,7 @@ SQL을 생성하기 전에, 먼저 사용자 질문이 다음 중 어떤 유형
             aggregation_context = aggregation_context_to_dict(agg_ctx)
             logger.info(f"Aggregation query detected: {aggregation_context}")
 
-        return {
+        response = {
             "success": result.success,
             "data": result.data,
             "rowCount": result.row_count,
@@ -1621,9 +2456,17 @@ SQL을 생성하기 전에, 먼저 사용자 질문이 다음 중 어떤 유형
             "aggregationContext": aggregation_context,  # 집계 컨텍스트 (None이면 일반 쿼리)
             "llmChartType": llm_chart_type,         # LLM 추천 차트 타입
             "insightTemplate": insight_template,    # LLM 생성 인사이트 템플릿
-            "summaryStatsTemplate": summary_stats_template  # LLM 생성 summaryStats 템플릿
+            "summaryStatsTemplate": summary_stats_template,  # LLM 생성 summaryStats 템플릿
+            "llmSkipped": llm_skipped               # 템플릿 매칭으로 LLM 호출 생략 여부
         }
 
+        # 재시도 없이 성공한 응답만 캐싱
+        if result.success and not retried:
+            # 호출자가 반환된 응답을 수정해도 캐시 항목이 바뀌지 않도록 복사본 저장
+            self._response_cache.set(cache_key, copy.deepcopy(response))
+
+        return response
+
     def _build_conversation_context(
         self,
         conversation_history: Optional[List[Dict[str, Any]]],
@@ -1670,7 +2513,7 @@ SQL을 생성하기 전에, 먼저 사용자 질문이 다음 중 어떤 유형
 
         # Phase 2: 항상 WHERE 조건 누적 (is_refinement 조건 제거)
         # 4단계+ 체이닝에서 조건 유실 방지를 위해 항상 누적된 조건을 LLM에 전달
-        accumulated_conditions = []
+        accumulated_conditions: Tuple[str, ...] = ()
 
         # 전체 대화 이력에서 WHERE 조건 누적
         for msg in conversation_history:
@@ -1685,7 +2528,7 @@ SQL을 생성하기 전에, 먼저 사용자 질문이 다음 중 어떤 유형
                     conditions = extract_where_conditions(sql)
                     logger.debug(f"Extracted conditions from SQL: {conditions}")
                 else:
-                    conditions = []
+                    conditions = ()
 
                 if conditions:
                     # 기존 조건과 병합 (동일 필드는 새 조건으로 대체)
@@ -1708,7 +2551,8 @@ SQL을 생성하기 전에, 먼저 사용자 질문이 다음 중 어떤 유형
             previous_result_summary=result_summary,
             accumulated_where_conditions=accumulated_conditions,
             is_refinement=is_refinement,
-            conversation_history=conversation_history  # 전체 대화 이력 저장
+            # 전체 대화 이력 저장 (프롬프트 구성용으로 1회 변환)
+            conversation_history=tuple(ConvEntry.from_message(msg) for msg in conversation_history)
         )
 
     def _get_previous_row_count(
@@ -1767,3 +2611,9 @@ def get_text_to_sql_service() -> TextToSqlService:
     if _service_instance is None:
         _service_instance = TextToSqlService()
     return _service_instance
+
+
+def close_text_to_sql_service() -> None:
+    """싱글톤 인스턴스의 커넥션 풀 종료 (생성된 적 없으면 무시)"""
+    if _service_instance is not None:
+        _service_instance.close()
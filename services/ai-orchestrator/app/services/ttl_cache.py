@@ -0,0 +1,72 @@
+"""
+TTL + LRU 인메모리 캐시
+
+반복 질문에 대한 RAG 조회/SQL 생성 결과 등을 짧은 시간 동안 재사용하기 위한
+프로세스 로컬 캐시입니다.
+
+- 최대 항목 수 초과 시 가장 오래 사용되지 않은 항목부터 제거 (LRU)
+- 저장 후 ttl_seconds가 지난 항목은 조회 시 만료 처리
+- 스레드 풀(asyncio.to_thread)에서도 호출되므로 잠금으로 보호
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Generic, Hashable, Optional, Tuple, TypeVar
+
+V = TypeVar("V")
+
+
+class TtlLruCache(Generic[V]):
+    """만료 시간이 있는 LRU 캐시"""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        """
+        Args:
+            max_entries: 최대 항목 수 (0 이하이면 캐시 비활성화)
+            ttl_seconds: 항목 유효 시간 (초)
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, Tuple[float, V]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl_seconds > 0
+
+    def get(self, key: Hashable) -> Optional[V]:
+        """캐시 조회 (없거나 만료 시 None)"""
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: V) -> None:
+        """캐시 저장 (최대 항목 수 초과 시 LRU 항목 제거)"""
+        if not self.enabled:
+            return
+
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
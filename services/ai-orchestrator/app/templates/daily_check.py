@@ -5,8 +5,32 @@
 - 쿼리 템플릿: 5개 (오늘 요약, 상태 분포, 환불, 전일 비교, 오류/실패)
 - RenderSpec 템플릿: Composite (Table + Pie Chart)
 """
-from datetime import datetime, timedelta
-from typing import Dict, Any, List
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Tuple
+
+
+@lru_cache(maxsize=32)
+def _daily_check_time_ranges(today: str) -> Tuple[str, str, str, str]:
+    """
+    점검 대상 날짜의 ISO 8601 시간 범위 (날짜별 캐싱)
+
+    Returns:
+        (today_start, today_end, yesterday_start, yesterday_end) 튜플
+    """
+    try:
+        base = date.fromisoformat(today)
+    except ValueError:
+        # 0 채움 없는 날짜(예: 2024-1-5)는 strptime으로 처리
+        base = datetime.strptime(today, "%Y-%m-%d").date()
+    yesterday = (base - timedelta(days=1)).isoformat()
+    tomorrow = (base + timedelta(days=1)).isoformat()
+    return (
+        f"{today}T00:00:00Z",
+        f"{tomorrow}T00:00:00Z",
+        f"{yesterday}T00:00:00Z",
+        f"{today}T00:00:00Z",
+    )
 
 
 def get_daily_check_queries(target_date: str = None) -> List[Dict[str, Any]]:
@@ -20,14 +44,9 @@ def get_daily_check_queries(target_date: str = None) -> List[Dict[str, Any]]:
         5개의 QueryPlan 딕셔너리 리스트
     """
     today = target_date or datetime.now().strftime("%Y-%m-%d")
-    yesterday = (datetime.strptime(today, "%Y-%m-%d") - timedelta(days=1)).strftime("%Y-%m-%d")
-    tomorrow = (datetime.strptime(today, "%Y-%m-%d") + timedelta(days=1)).strftime("%Y-%m-%d")
 
-    # ISO 8601 형식 시간 범위
-    today_start = f"{today}T00:00:00Z"
-    today_end = f"{tomorrow}T00:00:00Z"
-    yesterday_start = f"{yesterday}T00:00:00Z"
-    yesterday_end = f"{today}T00:00:00Z"
+    # ISO 8601 형식 시간 범위 (쿼리 목록은 호출측에서 변경될 수 있으므로 매번 새로 구성)
+    today_start, today_end, yesterday_start, yesterday_end = _daily_check_time_ranges(today)
 
     return [
         # 1. 오늘 거래 요약
@@ -145,14 +164,16 @@ def get_daily_check_context(metrics: Dict, status_dist: List[Dict], target_date:
 # ============================================
 
 def _safe_get_first_row(result: Dict) -> Dict:
-    """결과에서 첫 번째 행 안전하게 추출"""
-    rows = result.get("data", {}).get("rows", [])
+    """결과에서 첫 번째 행 안전하게 추출 (기본값 dict/list는 결과가 없을 때만 생성)"""
+    data = result.get("data")
+    rows = data.get("rows") if data else None
     return rows[0] if rows else {}
 
 
 def _safe_get_rows(result: Dict) -> List[Dict]:
     """결과에서 모든 행 추출"""
-    return result.get("data", {}).get("rows", [])
+    data = result.get("data")
+    return data.get("rows", []) if data else []
 
 
 def _calculate_metrics(today: Dict, yesterday: Dict, refund: Dict, error: Dict = None) -> Dict:
@@ -217,11 +238,20 @@ def _build_summary_table_component(metrics: Dict) -> Dict:
 
 def _build_status_chart_component(status_dist: List[Dict]) -> Dict:
     """상태별 분포 차트 컴포넌트 생성"""
-    # 파이 차트용 summaryStats 계산
-    total = sum(row.get("count", 0) for row in status_dist)
-    sorted_dist = sorted(status_dist, key=lambda x: x.get("count", 0), reverse=True)
-    max_item = sorted_dist[0] if sorted_dist else {}
-    min_item = sorted_dist[-1] if sorted_dist else {}
+    # 파이 차트용 summaryStats 계산 (정렬 없이 한 번 순회로 합계/최다/최소 산출)
+    # 동률이면 최다는 먼저 나온 항목, 최소는 나중에 나온 항목 (내림차순 안정 정렬과 동일)
+    total = 0
+    max_item: Optional[Dict] = None
+    min_item: Optional[Dict] = None
+    for row in status_dist:
+        count = row.get("count", 0)
+        total += count
+        if max_item is None or count > max_item.get("count", 0):
+            max_item = row
+        if min_item is None or count <= min_item.get("count", 0):
+            min_item = row
+    max_item = max_item or {}
+    min_item = min_item or {}
 
     max_status = max_item.get("status", "-")
     max_count = max_item.get("count", 0)
@@ -2,20 +2,37 @@
 Pytest configuration and fixtures
 """
 
+import copy
 import pytest
 from fastapi.testclient import TestClient
 from unittest.mock import patch, MagicMock
 
 import sys
 import os
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_SERVICE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _SERVICE_ROOT not in sys.path:
+    sys.path.insert(0, _SERVICE_ROOT)
 
 from app.main import app
 
 
-@pytest.fixture
+# Core API 기본 응답 (테스트마다 복사해서 사용)
+_CORE_API_DEFAULT_RESPONSE = {
+    "requestId": "test-123",
+    "status": "success",
+    "data": {
+        "rows": [
+            {"orderId": 1, "customerId": 101, "status": "PAID", "totalAmount": 1000.00}
+        ]
+    },
+    "metadata": {"executionTimeMs": 10}
+}
+
+
+@pytest.fixture(scope="session")
 def client():
-    """FastAPI test client"""
+    """FastAPI test client (상태가 없으므로 세션 단위로 공유)"""
     return TestClient(app)
 
 
@@ -23,16 +40,7 @@ def client():
 def mock_core_api():
     """Mock Core API responses"""
     with patch("app.api.v1.chat.call_core_api") as mock:
-        mock.return_value = {
-            "requestId": "test-123",
-            "status": "success",
-            "data": {
-                "rows": [
-                    {"orderId": 1, "customerId": 101, "status": "PAID", "totalAmount": 1000.00}
-                ]
-            },
-            "metadata": {"executionTimeMs": 10}
-        }
+        mock.return_value = copy.deepcopy(_CORE_API_DEFAULT_RESPONSE)
         yield mock
 
 
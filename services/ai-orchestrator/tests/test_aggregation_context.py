@@ -16,34 +16,21 @@ from app.services.text_to_sql import (
 class TestDetectAggregationFunctions:
     """집계 함수 감지 테스트"""
 
-    def test_sum_detection(self):
-        """SUM 함수 감지"""
-        sql = "SELECT SUM(amount) AS total_amount FROM payments"
+    @pytest.mark.parametrize("sql,function,target_column,alias", [
+        ("SELECT SUM(amount) AS total_amount FROM payments", "SUM", "amount", "total_amount"),
+        ("SELECT COUNT(*) AS cnt FROM payments", "COUNT", "*", "cnt"),
+        ("SELECT AVG(amount) AS avg_amount FROM payments", "AVG", "amount", "avg_amount"),
+        # 별칭 없는 집계 함수
+        ("SELECT SUM(amount) FROM payments", "SUM", "amount", None),
+    ])
+    def test_single_aggregation(self, sql, function, target_column, alias):
+        """단일 집계 함수 감지 (SUM, COUNT(*), AVG, 별칭 없음)"""
         aggs = detect_aggregation_functions(sql)
 
         assert len(aggs) == 1
-        assert aggs[0].function == "SUM"
-        assert aggs[0].target_column == "amount"
-        assert aggs[0].alias == "total_amount"
-
-    def test_count_star_detection(self):
-        """COUNT(*) 감지"""
-        sql = "SELECT COUNT(*) AS cnt FROM payments"
-        aggs = detect_aggregation_functions(sql)
-
-        assert len(aggs) == 1
-        assert aggs[0].function == "COUNT"
-        assert aggs[0].target_column == "*"
-        assert aggs[0].alias == "cnt"
-
-    def test_avg_detection(self):
-        """AVG 함수 감지"""
-        sql = "SELECT AVG(amount) AS avg_amount FROM payments"
-        aggs = detect_aggregation_functions(sql)
-
-        assert len(aggs) == 1
-        assert aggs[0].function == "AVG"
-        assert aggs[0].target_column == "amount"
+        assert aggs[0].function == function
+        assert aggs[0].target_column == target_column
+        assert aggs[0].alias == alias
 
     def test_max_min_detection(self):
         """MAX, MIN 함수 감지"""
@@ -71,16 +58,6 @@ class TestDetectAggregationFunctions:
 
         assert len(aggs) == 0
 
-    def test_aggregation_without_alias(self):
-        """별칭 없는 집계 함수"""
-        sql = "SELECT SUM(amount) FROM payments"
-        aggs = detect_aggregation_functions(sql)
-
-        assert len(aggs) == 1
-        assert aggs[0].function == "SUM"
-        assert aggs[0].target_column == "amount"
-        # 별칭은 None 또는 없음
-
     def test_case_insensitivity(self):
         """대소문자 구분 없이 감지"""
         sql = "SELECT sum(amount) AS total, Count(*) AS cnt FROM payments"
@@ -286,10 +263,10 @@ class TestAggregationContextToDict:
             based_on_filters=["status = 'DONE'", "merchant_id = 'mer_001'"],
             humanized_filters=["상태: 완료", "가맹점: mer_001"],
             source_row_count=100,
-            aggregations=[
+            aggregations=(
                 AggregationInfo(function="SUM", target_column="amount", alias="total"),
                 AggregationInfo(function="COUNT", target_column="*", alias="cnt")
-            ],
+            ),
             has_group_by=True,
             group_by_columns=["merchant_id"]
         )
@@ -311,9 +288,9 @@ class TestAggregationContextToDict:
             based_on_filters=[],
             humanized_filters=[],
             source_row_count=None,
-            aggregations=[
-                AggregationInfo(function="AVG", target_column="amount", alias="avg_amount")
-            ],
+            aggregations=(
+                AggregationInfo(function="AVG", target_column="amount", alias="avg_amount"),
+            ),
             has_group_by=False,
             group_by_columns=[]
         )
@@ -10,9 +10,11 @@ Covers:
 - Phase 0 non-error followup date injection (_is_error_related_query, _has_date_in_message)
 """
 
+import copy
 import pytest
 import sys
 import os
+from types import MappingProxyType
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
@@ -34,9 +36,17 @@ from app.services.conversation_context import (
 # Fixtures
 # ============================================
 
-def _daily_check_query_result() -> dict:
-    """Fixture: daily check queryResult with context_for_followup."""
-    return {
+@pytest.fixture(scope="module")
+def daily_check_qr() -> MappingProxyType:
+    """Fixture: daily check queryResult with context_for_followup.
+
+    모듈 내 테스트가 공유하는 템플릿. MappingProxyType은 최상위 키만 읽기 전용이고
+    data / context_for_followup / metrics 등 중첩 dict는 테스트 간에 공유되는 가변 객체이다.
+    (대상 코드가 isinstance(..., dict/list)로 검사하므로 중첩 값은 감싸지 않음)
+    중첩 값을 포함해 어떤 값이든 바꿔야 하는 테스트는 반드시
+    copy.deepcopy(dict(daily_check_qr)) 후 수정한다.
+    """
+    return MappingProxyType({
         "requestId": "test-123",
         "status": "success",
         "data": {"rows": [], "aggregations": {}},
@@ -73,7 +83,7 @@ def _daily_check_query_result() -> dict:
                 {"field": "created_at", "value": "2026-02-25"},
             ],
         },
-    }
+    })
 
 
 def _daily_check_query_plan() -> dict:
@@ -120,7 +130,7 @@ def _make_user_msg(content: str = "오늘 결제 현황 알려줘") -> ChatMessa
 class TestExtractPreviousResultsComposite:
     """extract_previous_results should parse context_for_followup from composite result."""
 
-    def test_extract_previous_results_with_daily_check_composite(self):
+    def test_extract_previous_results_with_daily_check_composite(self, daily_check_qr):
         """composite 결과(rows 비어있고 context_for_followup 있는 경우)에서
         entity가 DailyCheck으로 변환되고 metrics에서 count/amount가 추출되어야 한다."""
         # Arrange
@@ -128,7 +138,7 @@ class TestExtractPreviousResultsComposite:
             _make_user_msg("오늘 결제 현황 알려줘"),
             _make_assistant_msg(
                 content="일일점검 결과입니다.",
-                query_result=_daily_check_query_result(),
+                query_result=daily_check_qr,
                 query_plan=_daily_check_query_plan(),
             ),
         ]
@@ -155,11 +165,11 @@ class TestExtractPreviousResultsEmptyRowsWithContext:
     """extract_previous_results should include result even when count is 0
     if context_for_followup exists."""
 
-    def test_extract_previous_results_with_empty_rows_and_context(self):
+    def test_extract_previous_results_with_empty_rows_and_context(self, daily_check_qr):
         """rows가 비어있고 todayCount가 0이어도 context_for_followup이 있으면
         결과에 포함되어야 한다."""
         # Arrange
-        qr = _daily_check_query_result()
+        qr = copy.deepcopy(dict(daily_check_qr))
         # todayCount를 0으로 설정
         qr["context_for_followup"]["metrics"]["todayCount"] = 0
         qr["context_for_followup"]["metrics"]["todayAmount"] = 0
@@ -192,7 +202,7 @@ class TestExtractPreviousResultsEmptyRowsWithContext:
 class TestBuildConversationContextComposite:
     """build_conversation_context should handle composite daily-check results."""
 
-    def test_build_conversation_context_with_composite(self):
+    def test_build_conversation_context_with_composite(self, daily_check_qr):
         """composite daily-check 결과가 있는 대화 이력에서 컨텍스트를 빌드하면
         DailyCheck 엔티티로 표시되어야 한다."""
         # Arrange
@@ -200,7 +210,7 @@ class TestBuildConversationContextComposite:
             _make_user_msg("오늘 결제 현황 알려줘"),
             _make_assistant_msg(
                 content="일일점검 결과입니다.",
-                query_result=_daily_check_query_result(),
+                query_result=daily_check_qr,
                 query_plan=_daily_check_query_plan(),
             ),
         ]
@@ -223,7 +233,7 @@ class TestBuildSqlHistoryDailyCheck:
     """build_sql_history should convert daily_check_template results into
     structured SQL history with dailyCheckContext."""
 
-    def test_build_sql_history_with_daily_check(self):
+    def test_build_sql_history_with_daily_check(self, daily_check_qr):
         """daily_check_template 모드의 assistant 메시지가 SQL 히스토리로 변환될 때
         dailyCheckContext에 targetDate, metrics, availableFilters가 포함되어야 한다."""
         # Arrange
@@ -231,7 +241,7 @@ class TestBuildSqlHistoryDailyCheck:
             _make_user_msg("오늘 결제 현황 알려줘"),
             _make_assistant_msg(
                 content="일일점검 결과입니다.",
-                query_result=_daily_check_query_result(),
+                query_result=daily_check_qr,
                 query_plan=_daily_check_query_plan(),
             ),
         ]
@@ -273,7 +283,7 @@ class TestBuildSqlHistoryDailyCheck:
 class TestFindDailyCheckContext:
     """_find_daily_check_context should return complete metrics and availableFilters."""
 
-    def test_find_daily_check_context_returns_full_metrics(self):
+    def test_find_daily_check_context_returns_full_metrics(self, daily_check_qr):
         """대화 이력에서 일일점검 컨텍스트를 찾으면 targetDate, metrics,
         availableFilters가 모두 반환되어야 한다."""
         # Arrange
@@ -281,7 +291,7 @@ class TestFindDailyCheckContext:
             _make_user_msg("오늘 결제 현황 알려줘"),
             _make_assistant_msg(
                 content="일일점검 결과입니다.",
-                query_result=_daily_check_query_result(),
+                query_result=daily_check_qr,
                 query_plan=_daily_check_query_plan(),
             ),
         ]
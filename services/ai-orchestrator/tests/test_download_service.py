@@ -0,0 +1,75 @@
+"""
+다운로드 서비스 테스트
+
+NDJSON 스트리밍 생성기가 배치 단위로 행을 직렬화하는지 검증합니다.
+"""
+
+import json
+import sys
+import os
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+import psycopg
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.download_service import generate_ndjson
+
+
+def _mock_service(batches=None, error=None):
+    """cursor.fetchmany()가 batches를 차례로 반환하는 TextToSqlService mock"""
+    cursor = MagicMock()
+    cursor.fetchmany.side_effect = list(batches or []) + [[]]
+    if error is not None:
+        cursor.execute.side_effect = error
+    conn = MagicMock()
+    conn.cursor.return_value.__enter__.return_value = cursor
+    service = MagicMock()
+    service._get_download_connection.return_value.__enter__.return_value = conn
+    return service
+
+
+class TestGenerateNdjson:
+    """NDJSON 스트리밍 테스트"""
+
+    def test_rows_streamed_one_json_per_line(self):
+        service = _mock_service([
+            [{"payment_key": "pk_1", "amount": 1000}, {"payment_key": "pk_2", "amount": Decimal("2.5")}],
+            [{"payment_key": "pk_3", "amount": None}],
+        ])
+
+        chunks = list(generate_ndjson(service, "SELECT * FROM payments"))
+
+        # 배치마다 하나의 청크
+        assert len(chunks) == 2
+        lines = b"".join(chunks).decode("utf-8").splitlines()
+        assert [json.loads(line) for line in lines] == [
+            {"payment_key": "pk_1", "amount": 1000},
+            {"payment_key": "pk_2", "amount": "2.5"},
+            {"payment_key": "pk_3", "amount": None},
+        ]
+
+    def test_large_numeric_kept_exact(self):
+        """NUMERIC은 float 반올림 없이 CSV와 동일한 자릿수로 출력"""
+        service = _mock_service([[{"amount": Decimal("12345678901234567.89")}]])
+
+        chunks = list(generate_ndjson(service, "SELECT amount FROM payments"))
+
+        assert json.loads(chunks[0]) == {"amount": "12345678901234567.89"}
+
+    def test_uses_server_side_cursor(self):
+        """전체 결과를 클라이언트로 가져오지 않도록 named 커서 사용"""
+        service = _mock_service([[{"payment_key": "pk_1"}]])
+
+        list(generate_ndjson(service, "SELECT * FROM payments"))
+
+        conn = service._get_download_connection.return_value.__enter__.return_value
+        assert conn.cursor.call_args.kwargs["name"] == "ndjson_download"
+
+    def test_sql_error_yields_error_line(self):
+        service = _mock_service(error=psycopg.Error("relation does not exist"))
+
+        chunks = list(generate_ndjson(service, "SELECT * FROM paymnts"))
+
+        assert json.loads(chunks[0]) == {"error": "relation does not exist"}
@@ -0,0 +1,104 @@
+"""
+humanize_where_condition 단위 테스트
+
+WHERE 조건 → 사용자 친화적 한글 표현 변환 규칙과 패턴 우선순위를 검증합니다.
+"""
+
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.text_to_sql import (
+    humanize_where_condition,
+    _parse_interval_literal,
+    _tokenize_condition,
+)
+
+
+class TestHumanizeWhereCondition:
+    """조건 유형별 변환 테스트"""
+
+    @pytest.mark.parametrize("condition, expected", [
+        ("created_at >= NOW() - INTERVAL '3 months'", "기간: 최근 3개월"),
+        ("created_at >= NOW() - interval '2 Weeks'", "기간: 최근 2주"),
+        ("order_name LIKE '%도서%'", "상품명: 도서 포함"),
+        ("order_name ILIKE '%가구%'", "상품명: 가구 포함"),
+        ("status IN ('DONE', 'CANCELED')", "상태: 완료, 취소"),
+        ("method IN ('CARD','EASY_PAY')", "결제수단: 카드, 간편결제"),
+        ("amount BETWEEN 10000 AND 50000", "금액: 10,000 ~ 50,000"),
+        ("amount >= 100000", "금액: 100,000 이상"),
+        ("amount <= 5000", "금액: 5,000 이하"),
+        ("amount > 300", "금액: 300 초과"),
+        ("amount < 20", "금액: 20 미만"),
+        ("status = 'DONE'", "상태: 완료"),
+        ("method = 'CARD'", "결제수단: 카드"),
+        ("merchant_id = 'mer_001'", "가맹점: mer_001"),
+        ("created_at >= '2024-01-01'", "기간: 2024-01-01"),
+    ])
+    def test_humanize(self, condition, expected):
+        assert humanize_where_condition(condition) == expected
+
+    @pytest.mark.parametrize("condition", [
+        "customer_id IS NULL",
+        "order_name LIKE 'abc%'",
+        "amount BETWEEN 1.5 AND 3",
+        "status <> 'DONE'",
+    ])
+    def test_unsupported_condition_returns_original(self, condition):
+        assert humanize_where_condition(condition) == condition
+
+    def test_operator_inside_string_literal_ignored(self):
+        """문자열 리터럴 내부의 연산자는 비교 조건으로 해석하지 않음"""
+        assert humanize_where_condition("order_name = 'a >= 5'") == "상품명: a >= 5"
+
+    def test_not_equal_number_is_not_greater_than(self):
+        """<> 연산자를 > 비교로 오인하지 않음"""
+        assert humanize_where_condition("amount <> 5") == "amount <> 5"
+
+    def test_function_name_ending_with_in_is_not_in_clause(self):
+        """MIN( 등 IN으로 끝나는 함수명을 IN 절로 오인하지 않음"""
+        condition = "amount > (SELECT MIN(amount) FROM payments)"
+        assert humanize_where_condition(condition) == condition
+
+    def test_repeated_condition_served_from_cache(self):
+        """동일 조건 재변환 시 캐시에서 반환"""
+        humanize_where_condition.cache_clear()
+        humanize_where_condition("status = 'DONE'")
+        humanize_where_condition("status = 'DONE'")
+
+        info = humanize_where_condition.cache_info()
+        assert info.hits == 1
+        assert info.misses == 1
+
+
+class TestTokenizeCondition:
+    """조건 토크나이저 테스트"""
+
+    def test_tokenize_comparison(self):
+        assert _tokenize_condition("amount >= 10000") == [
+            ("WORD", "AMOUNT"), ("OP", ">="), ("NUMBER", "10000"),
+        ]
+
+    def test_tokenize_string_literal(self):
+        assert _tokenize_condition("status IN ('DONE', 'A B')") == [
+            ("WORD", "STATUS"), ("WORD", "IN"), ("PUNCT", "("),
+            ("STRING", "DONE"), ("PUNCT", ","), ("STRING", "A B"), ("PUNCT", ")"),
+        ]
+
+
+class TestParseIntervalLiteral:
+    """INTERVAL 리터럴 파싱 테스트"""
+
+    @pytest.mark.parametrize("literal, expected", [
+        ("3 months", ("3", "months")),
+        ("12  hours", ("12", "hours")),
+        ("3", None),
+        ("months 3", None),
+        (" 3 months", None),
+        ("3 mo-nths", None),
+        ("", None),
+    ])
+    def test_parse_interval_literal(self, literal, expected):
+        assert _parse_interval_literal(literal) == expected
@@ -15,6 +15,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from app.services.text_to_sql import (
     TextToSqlService,
     ConversationContext,
+    ConvEntry,
     extract_where_conditions,
     humanize_where_condition,
 )
@@ -28,11 +29,24 @@ class TestImplicitReferencePrompt:
         """TextToSqlService 인스턴스 (LLM 호출 없이 프롬프트 테스트용)"""
         return TextToSqlService()
 
-    def test_prompt_contains_implicit_reference_guidelines(self, service):
+    @pytest.fixture
+    def context(self):
+        """질문 유형 판단이 필요한 대화 컨텍스트 (이력 있음, 서버에서 참조 표현 미감지)"""
+        return ConversationContext(
+            previous_question="최근 3개월 결제건 조회",
+            previous_sql="SELECT * FROM payments LIMIT 1000;",
+            previous_result_summary="1000건 조회됨",
+            conversation_history=[
+                ConvEntry(role="user", content="최근 3개월 결제건 조회"),
+                ConvEntry(role="assistant", content="결과입니다", sql="SELECT * FROM payments LIMIT 1000;"),
+            ],
+        )
+
+    def test_prompt_contains_implicit_reference_guidelines(self, service, context):
         """프롬프트에 암시적 참조 가이드라인이 포함되는지 확인"""
         prompt = service._build_prompt(
             question="mer_008 가맹점만",
-            conversation_context=None,
+            conversation_context=context,
             rag_context=""
         )
 
@@ -41,11 +55,11 @@ class TestImplicitReferencePrompt:
         assert "[값] ~만" in prompt, "'[값] ~만' 패턴 가이드라인이 프롬프트에 없음"
         assert "refinement 판단 기준" in prompt, "refinement 판단 기준이 프롬프트에 없음"
 
-    def test_prompt_contains_implicit_reference_examples(self, service):
+    def test_prompt_contains_implicit_reference_examples(self, service, context):
         """프롬프트에 암시적 참조 예시가 포함되는지 확인"""
         prompt = service._build_prompt(
             question="DONE 상태만",
-            conversation_context=None,
+            conversation_context=context,
             rag_context=""
         )
 
@@ -75,14 +89,14 @@ class TestConversationFlowBuilder:
             accumulated_where_conditions=["created_at >= NOW() - INTERVAL '3 months'"],
             is_refinement=False,
             conversation_history=[
-                {"role": "user", "content": "최근 3개월 결제건 조회"},
-                {
-                    "role": "assistant",
-                    "content": "결과입니다",
-                    "sql": "SELECT * FROM payments WHERE created_at >= NOW() - INTERVAL '3 months' LIMIT 1000;",
-                    "rowCount": 1000,
-                    "whereConditions": ["created_at >= NOW() - INTERVAL '3 months'"]
-                }
+                ConvEntry(role="user", content="최근 3개월 결제건 조회"),
+                ConvEntry(
+                    role="assistant",
+                    content="결과입니다",
+                    sql="SELECT * FROM payments WHERE created_at >= NOW() - INTERVAL '3 months' LIMIT 1000;",
+                    row_count=1000,
+                    where_conditions=("created_at >= NOW() - INTERVAL '3 months'",)
+                )
             ]
         )
 
@@ -102,14 +116,14 @@ class TestConversationFlowBuilder:
             accumulated_where_conditions=["created_at >= NOW() - INTERVAL '1 months'"],
             is_refinement=False,
             conversation_history=[
-                {"role": "user", "content": "최근 1개월 결제건"},
-                {
-                    "role": "assistant",
-                    "content": "결과입니다",
-                    "sql": "SELECT * FROM payments WHERE created_at >= NOW() - INTERVAL '1 months' LIMIT 1000;",
-                    "rowCount": 500,
-                    "whereConditions": ["created_at >= NOW() - INTERVAL '1 months'"]
-                }
+                ConvEntry(role="user", content="최근 1개월 결제건"),
+                ConvEntry(
+                    role="assistant",
+                    content="결과입니다",
+                    sql="SELECT * FROM payments WHERE created_at >= NOW() - INTERVAL '1 months' LIMIT 1000;",
+                    row_count=500,
+                    where_conditions=("created_at >= NOW() - INTERVAL '1 months'",)
+                )
             ]
         )
 
@@ -127,14 +141,14 @@ class TestConversationFlowBuilder:
             accumulated_where_conditions=["created_at >= '2024-01-15'"],
             is_refinement=False,
             conversation_history=[
-                {"role": "user", "content": "오늘 결제 내역"},
-                {
-                    "role": "assistant",
-                    "content": "결과입니다",
-                    "sql": "SELECT * FROM payments WHERE created_at >= '2024-01-15' LIMIT 1000;",
-                    "rowCount": 200,
-                    "whereConditions": ["created_at >= '2024-01-15'"]
-                }
+                ConvEntry(role="user", content="오늘 결제 내역"),
+                ConvEntry(
+                    role="assistant",
+                    content="결과입니다",
+                    sql="SELECT * FROM payments WHERE created_at >= '2024-01-15' LIMIT 1000;",
+                    row_count=200,
+                    where_conditions=("created_at >= '2024-01-15'",)
+                )
             ]
         )
 
@@ -202,14 +216,14 @@ class TestFullPromptWithConversation:
             accumulated_where_conditions=["created_at >= NOW() - INTERVAL '3 months'"],
             is_refinement=False,
             conversation_history=[
-                {"role": "user", "content": "최근 3개월 결제건 조회"},
-                {
-                    "role": "assistant",
-                    "content": "결과입니다",
-                    "sql": "SELECT * FROM payments WHERE created_at >= NOW() - INTERVAL '3 months' LIMIT 1000;",
-                    "rowCount": 1000,
-                    "whereConditions": ["created_at >= NOW() - INTERVAL '3 months'"]
-                }
+                ConvEntry(role="user", content="최근 3개월 결제건 조회"),
+                ConvEntry(
+                    role="assistant",
+                    content="결과입니다",
+                    sql="SELECT * FROM payments WHERE created_at >= NOW() - INTERVAL '3 months' LIMIT 1000;",
+                    row_count=1000,
+                    where_conditions=("created_at >= NOW() - INTERVAL '3 months'",)
+                )
             ]
         )
 
@@ -265,13 +279,13 @@ class TestFullPromptWithConversation:
                 accumulated_where_conditions=[],
                 is_refinement=False,
                 conversation_history=[
-                    {"role": "user", "content": scenario["previous"]},
-                    {
-                        "role": "assistant",
-                        "content": "결과입니다",
-                        "sql": scenario["previous_sql"],
-                        "rowCount": 100
-                    }
+                    ConvEntry(role="user", content=scenario["previous"]),
+                    ConvEntry(
+                        role="assistant",
+                        content="결과입니다",
+                        sql=scenario["previous_sql"],
+                        row_count=100
+                    )
                 ]
             )
 
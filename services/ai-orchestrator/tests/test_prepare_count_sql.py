@@ -120,3 +120,30 @@ class TestPrepareCountSql:
         assert result.endswith(") sub")
         assert "; ) sub" not in result
         assert ";) sub" not in result
+
+    def test_prepare_count_sql_keeps_cte_limit(self):
+        """CTE 내부의 LIMIT(상위 N개)은 유지되고 메인 쿼리 끝의 LIMIT만 제거됨"""
+        sql = (
+            "WITH top AS ("
+            "SELECT merchant_id, COUNT(*) as cnt "
+            "FROM payments "
+            "GROUP BY merchant_id "
+            "ORDER BY cnt DESC "
+            "LIMIT 5"
+            ") "
+            "SELECT * FROM top LIMIT 1000;"
+        )
+
+        result = TextToSqlService._prepare_count_sql(sql)
+
+        assert "LIMIT 5" in result
+        assert "LIMIT 1000" not in result
+        assert result.endswith("SELECT * FROM top) sub")
+
+    def test_prepare_count_sql_removes_offset_before_limit(self):
+        """OFFSET이 LIMIT보다 먼저 와도 모두 제거됨"""
+        sql = "SELECT * FROM payments ORDER BY created_at DESC OFFSET 10 LIMIT 100"
+
+        result = TextToSqlService._prepare_count_sql(sql)
+
+        assert result == "SELECT COUNT(*) as cnt FROM (SELECT * FROM payments) sub"
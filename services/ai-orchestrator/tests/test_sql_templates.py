@@ -0,0 +1,87 @@
+"""
+SQL 템플릿 매칭 테스트
+
+정형 질문은 LLM 호출 없이 템플릿 SQL로 처리되고,
+그 외 질문은 매칭되지 않아야 한다.
+"""
+
+import pytest
+import sys
+import os
+from unittest.mock import AsyncMock, MagicMock, patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.sql_templates import match_sql_template
+from app.services.text_to_sql import TextToSqlService, SqlResult
+
+
+class TestMatchSqlTemplate:
+    """템플릿 매칭 테스트"""
+
+    @pytest.mark.parametrize("question", ["오늘 매출", "금일 총 매출 얼마야?", "오늘 매출 합계 알려줘"])
+    def test_today_revenue(self, question):
+        name, sql = match_sql_template(question)
+        assert name == "today_revenue"
+        assert "SUM(amount)" in sql
+        assert "status = 'DONE'" in sql
+
+    def test_merchant_settlements(self):
+        name, sql = match_sql_template("mer_001 가맹점의 정산 내역 보여줘")
+        assert name == "merchant_settlements"
+        assert "FROM settlements" in sql
+        assert "merchant_id = 'mer_001'" in sql
+
+    def test_recent_failed_payments(self):
+        name, sql = match_sql_template("최근 20건 실패 결제")
+        assert name == "recent_failed_payments"
+        assert "status = 'ABORTED'" in sql
+        assert sql.endswith("LIMIT 20;")
+
+    @pytest.mark.parametrize("question", [
+        "",
+        "오늘 매출을 가맹점별로 보여줘",
+        "mer_001 정산 내역 중 PAID_OUT만",
+        "최근 3개월 결제건 조회",
+        "mer_001' OR 1=1 정산",
+    ])
+    def test_non_canonical_questions_not_matched(self, question):
+        assert match_sql_template(question) is None
+
+
+class TestQueryWithTemplate:
+    """query() 템플릿 경로 테스트"""
+
+    @pytest.mark.asyncio
+    async def test_template_question_skips_llm(self):
+        with patch.dict(os.environ, {"LLM_PROVIDER": "openai"}):
+            service = TextToSqlService()
+        service._get_rag_context = AsyncMock(return_value="")
+        service._llm = MagicMock()
+
+        executed = SqlResult(success=True, data=[{"total_amount": 1000}], row_count=1, sql="")
+        with patch.object(service, "execute_sql", return_value=executed) as mock_execute:
+            result = await service.query("오늘 매출")
+
+        assert result["llmSkipped"] is True
+        service._llm.astream.assert_not_called()
+        service._get_rag_context.assert_not_awaited()
+        assert "FROM payments" in mock_execute.call_args.args[0]
+
+    @pytest.mark.asyncio
+    async def test_refinement_question_uses_llm(self):
+        with patch.dict(os.environ, {"LLM_PROVIDER": "openai"}):
+            service = TextToSqlService()
+        service._get_rag_context = AsyncMock(return_value="")
+        async def _astream(messages):
+            yield MagicMock(content='{"sql": "SELECT * FROM payments;", "chartType": "none"}')
+
+        service._llm = MagicMock()
+        service._llm.astream = MagicMock(side_effect=_astream)
+
+        executed = SqlResult(success=True, data=[], row_count=0, sql="SELECT * FROM payments LIMIT 1000")
+        with patch.object(service, "execute_sql", return_value=executed):
+            result = await service.query("오늘 매출", is_refinement=True)
+
+        assert result["llmSkipped"] is False
+        service._llm.astream.assert_called_once()
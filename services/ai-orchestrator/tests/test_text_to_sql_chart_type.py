@@ -84,6 +84,31 @@ SELECT * FROM payments WHERE status = 'DONE';
         assert chart_type is None
         assert chart_reason is None
 
+    def test_parse_fallback_strips_fences_only(self, text_to_sql_service):
+        """폴백 시 코드 펜스(대소문자 무관, 뒤 공백 포함)만 제거하고 SQL 본문은 유지"""
+        response = "```SQL  \nSELECT *\nFROM payments\nWHERE status = 'DONE';\n```  "
+
+        sql, chart_type, _, _, _ = text_to_sql_service._parse_llm_response(response)
+
+        assert sql == "SELECT *\nFROM payments\nWHERE status = 'DONE';"
+        assert chart_type is None
+
+    def test_parse_non_object_json_falls_back(self, text_to_sql_service):
+        """JSON 객체가 아닌 응답은 폴백 처리 (예외 없음)"""
+        sql, chart_type, _, _, _ = text_to_sql_service._parse_llm_response("12345")
+
+        assert sql == "12345"
+        assert chart_type is None
+
+    def test_parse_sql_only_response_skips_json_parse(self, text_to_sql_service):
+        """'{'로 시작하지 않고 JSON 블록도 없는 응답은 JSON 파싱을 시도하지 않음"""
+        with patch("app.services.text_to_sql._json_loads") as mock_loads:
+            sql, chart_type, _, _, _ = text_to_sql_service._parse_llm_response("SELECT * FROM payments;")
+
+        mock_loads.assert_not_called()
+        assert sql == "SELECT * FROM payments;"
+        assert chart_type is None
+
     def test_parse_pie_chart_type(self, text_to_sql_service):
         """pie 차트 타입 파싱"""
         response = '''```json
@@ -0,0 +1,219 @@
+"""
+Text-to-SQL 실행 결과 처리 테스트
+"""
+
+import sys
+import os
+from unittest.mock import MagicMock, patch
+
+import psycopg
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.text_to_sql import TextToSqlService, _IsoTimestampLoader, _IsoTimestamptzLoader
+
+
+class TestIsoTimestampLoaders:
+    """timestamp → ISO 문자열 로더 테스트"""
+
+    def test_timestamp_to_iso(self):
+        loader = _IsoTimestampLoader(0)
+        assert loader.load(b"2024-01-15 10:30:00") == "2024-01-15T10:30:00"
+
+    def test_timestamptz_hour_offset_expanded(self):
+        loader = _IsoTimestamptzLoader(0)
+        assert loader.load(b"2024-01-15 10:30:00.123456+09") == "2024-01-15T10:30:00.123456+09:00"
+
+    def test_timestamptz_minute_offset_kept(self):
+        loader = _IsoTimestamptzLoader(0)
+        assert loader.load(memoryview(b"2024-01-15 10:30:00-03:30")) == "2024-01-15T10:30:00-03:30"
+
+
+def _make_service() -> TextToSqlService:
+    return TextToSqlService(readonly_url="postgresql://test", max_rows=1000)
+
+
+def _mock_connection(rows):
+    """cursor.fetchall()이 rows를 반환하는 읽기 전용 연결 mock"""
+    cursor = MagicMock()
+    cursor.fetchall.return_value = rows
+    conn = MagicMock()
+    conn.cursor.return_value.__enter__.return_value = cursor
+    conn_cm = MagicMock()
+    conn_cm.__enter__.return_value = conn
+    return conn_cm, cursor
+
+
+class TestCountShortCircuit:
+    """사용자 지정 LIMIT 시 COUNT 생략 테스트"""
+
+    def test_get_outer_limit(self):
+        assert TextToSqlService._get_outer_limit("SELECT * FROM payments LIMIT 10;") == 10
+        assert TextToSqlService._get_outer_limit("SELECT * FROM payments LIMIT 10 OFFSET 20") == 10
+        assert TextToSqlService._get_outer_limit("SELECT * FROM payments") is None
+        # CTE 내부 LIMIT은 메인 쿼리 LIMIT이 아님
+        assert TextToSqlService._get_outer_limit(
+            "WITH top AS (SELECT merchant_id FROM payments LIMIT 5) SELECT * FROM top"
+        ) is None
+
+    def test_small_user_limit_skips_count(self):
+        service = _make_service()
+        conn_cm, _ = _mock_connection([{"payment_key": "pk_1"}, {"payment_key": "pk_2"}])
+
+        with patch.object(service, "_get_readonly_connection", return_value=conn_cm), \
+             patch.object(service, "_get_count") as mock_count:
+            result = service.execute_sql("SELECT * FROM payments ORDER BY amount DESC LIMIT 10")
+
+        mock_count.assert_not_called()
+        assert result.success is True
+        assert result.total_count == 2
+        assert result.is_truncated is False
+
+    def test_small_limit_query_not_rewritten(self):
+        service = _make_service()
+
+        with patch.object(service, "_fetch_rows", return_value=[]) as mock_fetch:
+            service.execute_sql("SELECT * FROM payments LIMIT 10")
+
+        mock_fetch.assert_called_once_with("SELECT * FROM payments LIMIT 10")
+
+
+class TestTruncationProbe:
+    """max_rows + 1건 조회로 잘림 여부 판단 테스트"""
+
+    def test_fetch_rows_caps_materialized_rows(self):
+        service = _make_service()
+        conn_cm, cursor = _mock_connection([])
+        cursor.fetchmany.return_value = [{"payment_key": "pk_1"}]
+
+        with patch.object(service, "_get_readonly_connection", return_value=conn_cm):
+            rows = service._fetch_rows("SELECT * FROM payments LIMIT 1001", max_rows=1001)
+
+        cursor.fetchmany.assert_called_once_with(1001)
+        cursor.fetchall.assert_not_called()
+        assert rows == [{"payment_key": "pk_1"}]
+
+    def test_build_probe_sql_replaces_outer_limit(self):
+        assert TextToSqlService._build_probe_sql(
+            "SELECT * FROM payments ORDER BY created_at DESC LIMIT 1000;", 1001
+        ) == "SELECT * FROM payments ORDER BY created_at DESC LIMIT 1001;"
+
+    def test_build_probe_sql_keeps_offset_and_cte_limit(self):
+        sql = "WITH top AS (SELECT * FROM payments LIMIT 5) SELECT * FROM top LIMIT 1000 OFFSET 20"
+        assert TextToSqlService._build_probe_sql(sql, 1001) == (
+            "WITH top AS (SELECT * FROM payments LIMIT 5) SELECT * FROM top LIMIT 1001 OFFSET 20"
+        )
+
+    def test_build_probe_sql_appends_limit(self):
+        assert TextToSqlService._build_probe_sql(
+            "WITH top AS (SELECT * FROM payments LIMIT 5) SELECT * FROM top;", 1001
+        ) == "WITH top AS (SELECT * FROM payments LIMIT 5) SELECT * FROM top LIMIT 1001"
+
+    def test_within_max_rows_skips_count(self):
+        service = _make_service()
+        rows = [{"payment_key": f"pk_{i}"} for i in range(1000)]
+
+        with patch.object(service, "_fetch_rows", return_value=rows) as mock_fetch, \
+             patch.object(service, "_get_count") as mock_count:
+            result = service.execute_sql("SELECT * FROM payments LIMIT 1000")
+
+        mock_fetch.assert_called_once_with("SELECT * FROM payments LIMIT 1001", max_rows=1001)
+        mock_count.assert_not_called()
+        assert result.row_count == 1000
+        assert result.total_count == 1000
+        assert result.is_truncated is False
+
+    def test_exceeding_max_rows_counts_and_truncates(self):
+        """max_rows 초과 시에만 COUNT로 전체 건수 확인"""
+        service = _make_service()
+        rows = [{"payment_key": f"pk_{i}"} for i in range(1001)]
+
+        with patch.object(service, "_fetch_rows", return_value=rows), \
+             patch.object(service, "_get_count", return_value=5000) as mock_count:
+            result = service.execute_sql("SELECT * FROM payments LIMIT 1000")
+
+        mock_count.assert_called_once_with("SELECT * FROM payments LIMIT 1000")
+        assert result.is_truncated is True
+        assert result.total_count == 5000
+        assert result.data == []
+
+    def test_fetch_error_returns_failure(self):
+        service = _make_service()
+
+        with patch.object(service, "_fetch_rows", side_effect=psycopg.errors.SyntaxError("bad sql")):
+            result = service.execute_sql("SELECT * FROM payments LIMIT 1000")
+
+        assert result.success is False
+        assert "bad sql" in result.error
+
+
+class TestConnectionOptions:
+    """읽기 전용 연결 세션 옵션 테스트"""
+
+    def test_session_options(self):
+        with patch.dict(os.environ, {"SQL_WORK_MEM": "64MB"}):
+            service = TextToSqlService(readonly_url="postgresql://test", timeout_seconds=10)
+
+        with patch.object(service, "_get_pool", return_value=None), \
+             patch("app.services.text_to_sql.psycopg.connect") as mock_connect:
+            service._get_readonly_connection()
+
+        options = mock_connect.call_args.kwargs["options"]
+        assert "-c statement_timeout=10000" in options
+        assert "-c work_mem=64MB" in options
+        assert "-c idle_in_transaction_session_timeout=60s" in options
+
+
+class TestConnectionPool:
+    """읽기 전용 커넥션 풀 테스트"""
+
+    def _fake_pool_module(self):
+        module = MagicMock()
+        module.ConnectionPool.return_value = MagicMock()
+        return module
+
+    def test_pool_created_once_and_reused(self):
+        service = _make_service()
+        module = self._fake_pool_module()
+
+        with patch.dict(sys.modules, {"psycopg_pool": module}):
+            service._get_readonly_connection()
+            service._get_readonly_connection()
+
+        module.ConnectionPool.assert_called_once()
+        kwargs = module.ConnectionPool.call_args.kwargs["kwargs"]
+        assert kwargs["options"] == service._connect_options
+        assert module.ConnectionPool.return_value.connection.call_count == 2
+
+    def test_fallback_to_direct_connection_without_psycopg_pool(self):
+        service = _make_service()
+
+        with patch.dict(sys.modules, {"psycopg_pool": None}), \
+             patch("app.services.text_to_sql.psycopg.connect") as mock_connect:
+            service._get_readonly_connection()
+
+        mock_connect.assert_called_once()
+        assert service._pool is None
+
+    def test_close_releases_pool(self):
+        service = _make_service()
+        module = self._fake_pool_module()
+
+        with patch.dict(sys.modules, {"psycopg_pool": module}):
+            service._get_readonly_connection()
+        service.close()
+
+        module.ConnectionPool.return_value.close.assert_called_once()
+        assert service._pool is None
+
+    def test_download_connection_bypasses_pool(self):
+        """다운로드는 풀을 점유하지 않도록 동일 세션 옵션의 개별 연결 사용"""
+        service = _make_service()
+        module = self._fake_pool_module()
+
+        with patch.dict(sys.modules, {"psycopg_pool": module}), \
+             patch("app.services.text_to_sql.psycopg.connect") as mock_connect:
+            service._get_download_connection()
+
+        module.ConnectionPool.assert_not_called()
+        assert mock_connect.call_args.kwargs["options"] == service._connect_options
@@ -0,0 +1,468 @@
+"""
+Text-to-SQL 프롬프트 구조 테스트
+
+정적 영역(규칙 + 패턴 가이드 + 스키마)은 매 요청 동일하게 유지되어
+LLM 제공자의 프롬프트 캐싱이 적중해야 하고,
+날짜/RAG/대화 이력/질문 등 동적 영역은 그 뒤에 분리되어야 한다.
+"""
+
+import pytest
+import sys
+import os
+from unittest.mock import AsyncMock, MagicMock, patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.text_to_sql import (
+    TextToSqlService,
+    ConversationContext,
+    ConvEntry,
+    SqlResult,
+    SCHEMA_PROMPT,
+    _STATIC_PROMPT_PREFIX,
+    _STATIC_PROMPT_PREFIX_FIRST_TURN,
+    _STATIC_PROMPT_PREFIX_REFINEMENT,
+)
+
+
+def _make_service(provider: str) -> TextToSqlService:
+    with patch.dict(os.environ, {"LLM_PROVIDER": provider}):
+        return TextToSqlService()
+
+
+def _streaming_llm(content: str) -> MagicMock:
+    """astream으로 응답을 청크 단위로 돌려주는 LLM 목"""
+    async def _astream(messages):
+        for i in range(0, len(content), 8):
+            yield MagicMock(content=content[i:i + 8])
+
+    llm = MagicMock()
+    llm.astream = MagicMock(side_effect=_astream)
+    return llm
+
+
+def _make_query_service(**env) -> TextToSqlService:
+    """query() 테스트용 서비스 (RAG 생략 + 스트리밍 LLM 목, env로 옵션 지정)"""
+    with patch.dict(os.environ, {"LLM_PROVIDER": "openai", **env}):
+        service = TextToSqlService()
+    service._get_rag_context = AsyncMock(return_value="")
+    service._llm = _streaming_llm('{"sql": "SELECT * FROM payments;", "chartType": "table"}')
+    return service
+
+
+def _make_context(is_refinement: bool = False) -> ConversationContext:
+    return ConversationContext(
+        previous_question="최근 3개월 결제건 조회",
+        previous_sql="SELECT * FROM payments WHERE status = 'DONE' LIMIT 1000;",
+        previous_result_summary="100건 조회됨",
+        conversation_history=[
+            ConvEntry(role="user", content="최근 3개월 결제건 조회"),
+            ConvEntry(role="assistant", content="결과입니다",
+             sql="SELECT * FROM payments WHERE status = 'DONE' LIMIT 1000;", row_count=100),
+        ],
+        is_refinement=is_refinement,
+    )
+
+
+class TestStaticPromptPrefix:
+    """정적 프롬프트 영역 테스트"""
+
+    def test_static_prefix_contains_schema_and_rules(self):
+        assert SCHEMA_PROMPT in _STATIC_PROMPT_PREFIX
+        assert "당신은 PostgreSQL SQL 전문가입니다." in _STATIC_PROMPT_PREFIX
+        assert "패턴 5" in _STATIC_PROMPT_PREFIX
+        assert "refinement 판단 기준" in _STATIC_PROMPT_PREFIX
+
+    def test_static_prefix_has_no_dynamic_content(self):
+        """날짜 등 요청마다 바뀌는 값은 정적 영역에 포함되지 않음"""
+        assert "현재 날짜" not in _STATIC_PROMPT_PREFIX
+        assert "## 현재 질문" not in _STATIC_PROMPT_PREFIX
+
+    def test_prompt_starts_with_static_prefix(self):
+        service = _make_service("openai")
+        prompt = service._build_prompt(question="오늘 결제 내역", rag_context="[faq] 문서")
+        assert prompt.startswith(_STATIC_PROMPT_PREFIX_FIRST_TURN)
+        assert prompt.index("## 참고 문서") > len(_STATIC_PROMPT_PREFIX_FIRST_TURN)
+        assert prompt.rstrip().endswith("오늘 결제 내역")
+
+
+class TestPromptMessages:
+    """LLM 호출 메시지 구성 테스트"""
+
+    def test_openai_messages_split_static_and_dynamic(self):
+        service = _make_service("openai")
+        messages = service._build_prompt_messages(question="DONE 상태만")
+
+        assert len(messages) == 2
+        assert messages[0].type == "system"
+        assert messages[0].content == _STATIC_PROMPT_PREFIX_FIRST_TURN
+        assert messages[1].type == "human"
+        assert "현재 날짜" in messages[1].content
+        assert "DONE 상태만" in messages[1].content
+
+    def test_anthropic_system_block_has_cache_control(self):
+        service = _make_service("anthropic")
+        messages = service._build_prompt_messages(question="DONE 상태만")
+
+        block = messages[0].content[0]
+        assert block["text"] == _STATIC_PROMPT_PREFIX_FIRST_TURN
+        assert block["cache_control"] == {"type": "ephemeral"}
+
+    def test_system_message_is_identical_across_requests(self):
+        """같은 대화 상태라면 질문/RAG가 달라도 system 메시지는 동일"""
+        service = _make_service("openai")
+        context = _make_context()
+
+        first = service._build_prompt_messages(question="오늘 매출", conversation_context=context)
+        second = service._build_prompt_messages(
+            question="mer_001 가맹점만", conversation_context=context, rag_context="[faq] 문서"
+        )
+
+        assert first[0].content == second[0].content == _STATIC_PROMPT_PREFIX
+        assert "대화 이력" in second[1].content
+
+
+class TestStaticPromptVariants:
+    """대화 상태별 정적 프롬프트 변형 테스트"""
+
+    def test_first_turn_omits_query_type_guide(self):
+        service = _make_service("openai")
+        messages = service._build_prompt_messages(question="오늘 매출")
+
+        assert messages[0].content == _STATIC_PROMPT_PREFIX_FIRST_TURN
+        assert "질문 유형 판단" not in messages[0].content
+        assert SCHEMA_PROMPT in messages[0].content
+
+    def test_refinement_uses_short_guide(self):
+        service = _make_service("openai")
+        messages = service._build_prompt_messages(
+            question="mer_001 가맹점만", conversation_context=_make_context(is_refinement=True)
+        )
+
+        assert messages[0].content == _STATIC_PROMPT_PREFIX_REFINEMENT
+        assert "refinement 판단 기준" not in messages[0].content
+        assert "현재 질문은 refinement입니다" in messages[0].content
+        assert "같은 컬럼 조건 처리" in messages[0].content
+        assert len(_STATIC_PROMPT_PREFIX_REFINEMENT) < len(_STATIC_PROMPT_PREFIX)
+
+
+class TestRagContextGate:
+    """RAG 조회 생략 조건 테스트"""
+
+    @pytest.mark.asyncio
+    async def test_short_question_skips_rag(self):
+        service = _make_service("openai")
+        service._rag_enabled = True
+        with patch("app.services.text_to_sql.get_rag_service") as mock_get_rag:
+            assert await service._get_rag_context("DONE만") == ""
+            mock_get_rag.assert_not_called()
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("question", ["환불율 알려줘", "정산 현황", "승인률은?"])
+    async def test_short_question_with_domain_keyword_uses_rag(self, question):
+        """짧아도 비즈니스 용어가 있으면 용어 정의 문서를 조회"""
+        service = _make_service("openai")
+        service._rag_enabled = True
+        doc = MagicMock(doc_type="business_logic", title="환불율", content="환불 건수 / 결제 건수")
+
+        with patch("app.services.text_to_sql.get_rag_service") as mock_get_rag:
+            mock_get_rag.return_value.search_docs = AsyncMock(return_value=[doc])
+            context = await service._get_rag_context(question)
+
+        assert context == "[business_logic] 환불율: 환불 건수 / 결제 건수"
+        mock_get_rag.return_value.search_docs.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_repeated_question_served_from_cache(self):
+        service = _make_service("openai")
+        service._rag_enabled = True
+        doc = MagicMock(doc_type="faq", title="환불 정책", content="환불은 7일 이내")
+
+        with patch("app.services.text_to_sql.get_rag_service") as mock_get_rag:
+            mock_get_rag.return_value.search_docs = AsyncMock(return_value=[doc])
+            first = await service._get_rag_context("최근 환불 내역 보여줘")
+            second = await service._get_rag_context("  최근 환불  내역 보여줘 ")
+
+        assert first == second == "[faq] 환불 정책: 환불은 7일 이내"
+        assert mock_get_rag.return_value.search_docs.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_lookup_not_cached(self):
+        service = _make_service("openai")
+        service._rag_enabled = True
+
+        with patch("app.services.text_to_sql.get_rag_service") as mock_get_rag:
+            mock_get_rag.return_value.search_docs = AsyncMock(side_effect=[RuntimeError("db down"), []])
+            assert await service._get_rag_context("최근 환불 내역 보여줘") == ""
+            assert await service._get_rag_context("최근 환불 내역 보여줘") == ""
+
+        assert mock_get_rag.return_value.search_docs.await_count == 2
+
+
+class TestRetryMessages:
+    """SQL 오류 재시도 메시지 테스트"""
+
+    def test_retry_messages_extend_original_messages(self):
+        service = _make_service("openai")
+        messages = service._build_prompt_messages(question="오늘 결제 내역", rag_context="[faq] 문서")
+
+        retry = service._build_retry_messages(messages, "SELECT * FROM paymnts", "relation does not exist")
+
+        assert retry[:2] == messages
+        assert retry[2].type == "ai"
+        assert retry[2].content == "SELECT * FROM paymnts"
+        assert retry[3].type == "human"
+        assert "relation does not exist" in retry[3].content
+        # 원본 메시지 리스트는 변경되지 않음
+        assert len(messages) == 2
+
+    @pytest.mark.asyncio
+    async def test_query_retry_skips_rag_lookup(self):
+        service = _make_query_service()
+        service._get_rag_context = AsyncMock(return_value="[faq] 문서")
+        llm = service._llm
+
+        failed = SqlResult(success=False, data=[], row_count=0, sql="SELECT * FROM payments", error="boom")
+        ok = SqlResult(success=True, data=[], row_count=0, sql="SELECT * FROM payments")
+        with patch.object(service, "execute_sql", side_effect=[failed, ok]):
+            result = await service.query("오늘 결제 내역 보여줘")
+
+        assert result["success"] is True
+        assert service._get_rag_context.await_count == 1
+        retry_messages = llm.astream.call_args_list[1].args[0]
+        assert retry_messages[0].content == _STATIC_PROMPT_PREFIX_FIRST_TURN
+        assert "boom" in retry_messages[-1].content
+
+
+class TestStreamingGeneration:
+    """LLM 응답 스트리밍 + 조기 검증 테스트"""
+
+    @pytest.mark.parametrize("buffer, expected", [
+        ('{"sql": "SELECT * FROM pay', None),
+        ('{"sql": "SELECT * FROM payments;", "chartT', "SELECT * FROM payments;"),
+        ('{"sql": "SELECT \\"id\\" FROM payments"', 'SELECT "id" FROM payments'),
+        ('{"chartType": "none"', None),
+    ])
+    def test_extract_streamed_sql(self, buffer, expected):
+        from app.services.text_to_sql import _extract_streamed_sql
+        assert _extract_streamed_sql(buffer) == expected
+
+    @pytest.mark.asyncio
+    async def test_sql_validated_once_during_stream(self):
+        service = _make_service("openai")
+        service._llm = _streaming_llm(
+            '{"sql": "SELECT * FROM payments;", "chartType": "bar", "insightTemplate": "총 {{count}}건"}'
+        )
+
+        with patch.object(service.validator, "validate", wraps=service.validator.validate) as mock_validate:
+            sql, validation, chart_type, insight, _ = await service.generate_sql("결제 내역", rag_context="")
+
+        mock_validate.assert_called_once_with("SELECT * FROM payments;")
+        assert sql == "SELECT * FROM payments;"
+        assert validation.is_valid
+        assert chart_type == "bar"
+        assert insight == "총 {{count}}건"
+
+
+class TestSpeculativeRetry:
+    """실행과 동시에 재시도 SQL을 미리 생성하는 옵션 테스트"""
+
+    @pytest.mark.asyncio
+    async def test_failed_execution_uses_speculative_retry(self):
+        service = _make_query_service(SQL_SPECULATIVE_RETRY="true")
+        failed = SqlResult(success=False, data=[], row_count=0, sql="SELECT * FROM payments", error="boom")
+        ok = SqlResult(success=True, data=[], row_count=0, sql="SELECT * FROM payments")
+        with patch.object(service, "execute_sql", side_effect=[failed, ok]):
+            result = await service.query("결제 내역 보여줘")
+
+        assert result["success"] is True
+        # 최초 생성 + 미리 시작한 재시도 생성 (오류 확인 후 추가 호출 없음)
+        assert service._llm.astream.call_count == 2
+        retry_messages = service._llm.astream.call_args_list[1].args[0]
+        assert "이전 SQL 실행이 실패했습니다" in retry_messages[-1].content
+
+    @pytest.mark.asyncio
+    async def test_successful_execution_does_not_use_retry(self):
+        service = _make_query_service(SQL_SPECULATIVE_RETRY="true")
+        ok = SqlResult(success=True, data=[], row_count=0, sql="SELECT * FROM payments")
+        with patch.object(service, "execute_sql", return_value=ok) as mock_execute:
+            result = await service.query("결제 내역 보여줘")
+
+        assert result["success"] is True
+        mock_execute.assert_called_once()
+
+
+class TestSqlGenerationCache:
+    """동일 질문 SQL 생성 결과 캐시 테스트"""
+
+    @pytest.mark.asyncio
+    async def test_repeated_question_skips_llm(self):
+        service = _make_query_service()
+        llm = service._llm
+        ok = SqlResult(success=True, data=[], row_count=0, sql="SELECT * FROM payments")
+        with patch.object(service, "execute_sql", return_value=ok) as mock_execute:
+            first = await service.query("결제 내역 보여줘")
+            second = await service.query("결제  내역 보여줘")
+
+        assert llm.astream.call_count == 1
+        assert service._get_rag_context.await_count == 1
+        assert mock_execute.call_count == 2     # 데이터는 매번 조회
+        assert first["llmSkipped"] is False
+        assert second["llmSkipped"] is True
+        assert second["sql"] == first["sql"]
+
+    @pytest.mark.asyncio
+    async def test_different_history_not_shared(self):
+        service = _make_query_service()
+        llm = service._llm
+        ok = SqlResult(success=True, data=[], row_count=0, sql="SELECT * FROM payments")
+        history = [
+            {"role": "user", "content": "최근 결제"},
+            {"role": "assistant", "content": "조회 완료", "sql": "SELECT * FROM payments"},
+        ]
+        with patch.object(service, "execute_sql", return_value=ok):
+            await service.query("DONE 상태만")
+            await service.query("DONE 상태만", conversation_history=history)
+
+        assert llm.astream.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_history_differing_only_in_row_count_not_shared(self):
+        """이전 결과 건수는 프롬프트에 들어가므로 rowCount만 달라도 다른 키"""
+        service = _make_query_service()
+        llm = service._llm
+        ok = SqlResult(success=True, data=[], row_count=0, sql="SELECT * FROM payments")
+
+        def _history(row_count):
+            return [
+                {"role": "user", "content": "최근 결제"},
+                {"role": "assistant", "content": "조회 완료", "sql": "SELECT * FROM payments", "rowCount": row_count},
+            ]
+
+        with patch.object(service, "execute_sql", return_value=ok):
+            await service.query("DONE 상태만", conversation_history=_history(5))
+            await service.query("DONE 상태만", conversation_history=_history(50000))
+
+        assert llm.astream.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_failed_execution_not_cached(self):
+        service = _make_query_service()
+        llm = service._llm
+        failed = SqlResult(success=False, data=[], row_count=0, sql="SELECT * FROM payments", error="boom")
+        with patch.object(service, "execute_sql", return_value=failed):
+            await service.query("결제 내역 보여줘", retry_on_error=False)
+            await service.query("결제 내역 보여줘", retry_on_error=False)
+
+        assert llm.astream.call_count == 2
+
+
+class TestResponseCache:
+    """최종 응답(데이터 포함) 캐시 테스트"""
+
+    @pytest.mark.asyncio
+    async def test_repeated_question_skips_execution(self):
+        service = _make_query_service(RESPONSE_CACHE_TTL_SECONDS="60")
+        ok = SqlResult(success=True, data=[{"payment_key": "pk_1"}], row_count=1, sql="SELECT * FROM payments")
+        with patch.object(service, "execute_sql", return_value=ok) as mock_execute:
+            first = await service.query("결제 내역 보여줘")
+            second = await service.query("결제 내역  보여줘")
+
+        mock_execute.assert_called_once()
+        assert second["data"] == first["data"]
+        assert first["llmSkipped"] is False
+        assert second["llmSkipped"] is True
+
+    @pytest.mark.asyncio
+    async def test_cached_response_not_shared_between_callers(self):
+        """캐시 적중 응답의 중첩 객체(data 등)는 호출마다 독립된 복사본"""
+        service = _make_query_service(RESPONSE_CACHE_TTL_SECONDS="60")
+        ok = SqlResult(success=True, data=[{"payment_key": "pk_1"}], row_count=1, sql="SELECT * FROM payments")
+        with patch.object(service, "execute_sql", return_value=ok):
+            first = await service.query("결제 내역 보여줘")
+            first["data"].append({"payment_key": "pk_x"})
+            second = await service.query("결제 내역 보여줘")
+            second["data"][0]["payment_key"] = "changed"
+            third = await service.query("결제 내역 보여줘")
+
+        assert third["data"] == [{"payment_key": "pk_1"}]
+
+    @pytest.mark.asyncio
+    async def test_history_row_count_not_shared(self):
+        """이전 결과 건수(sourceRowCount)가 다른 대화 이력의 응답을 재사용하지 않음"""
+        service = _make_query_service(RESPONSE_CACHE_TTL_SECONDS="60")
+        service._llm = _streaming_llm('{"sql": "SELECT COUNT(*) AS cnt FROM payments;", "chartType": "none"}')
+        ok = SqlResult(success=True, data=[{"cnt": 3}], row_count=1, sql="SELECT COUNT(*) AS cnt FROM payments")
+
+        def _history(row_count):
+            return [
+                {"role": "user", "content": "최근 결제"},
+                {"role": "assistant", "content": "조회 완료", "sql": "SELECT * FROM payments", "rowCount": row_count},
+            ]
+
+        with patch.object(service, "execute_sql", return_value=ok) as mock_execute:
+            first = await service.query("건수만", conversation_history=_history(5))
+            second = await service.query("건수만", conversation_history=_history(50000))
+
+        assert mock_execute.call_count == 2
+        assert first["aggregationContext"]["sourceRowCount"] == 5
+        assert second["aggregationContext"]["sourceRowCount"] == 50000
+
+    @pytest.mark.asyncio
+    async def test_retried_response_not_cached(self):
+        service = _make_query_service(RESPONSE_CACHE_TTL_SECONDS="60")
+        failed = SqlResult(success=False, data=[], row_count=0, sql="SELECT * FROM payments", error="boom")
+        ok = SqlResult(success=True, data=[], row_count=0, sql="SELECT * FROM payments")
+        with patch.object(service, "execute_sql", side_effect=[failed, ok, ok]) as mock_execute:
+            await service.query("결제 내역 보여줘")
+            await service.query("결제 내역 보여줘")
+
+        assert mock_execute.call_count == 3
+
+    def test_disabled_by_default(self):
+        service = _make_service("openai")
+        assert service._response_cache.enabled is False
+
+
+class TestLlmConfig:
+    """Text-to-SQL LLM 설정 테스트"""
+
+    def test_openai_uses_json_mode_and_token_cap(self):
+        with patch.dict(os.environ, {"LLM_PROVIDER": "openai", "OPENAI_API_KEY": "sk-test", "LLM_MAX_TOKENS": "512"}):
+            service = TextToSqlService()
+            llm = service._get_llm()
+
+        assert llm.model_kwargs["response_format"] == {"type": "json_object"}
+        assert llm.max_tokens == 512
+
+    def test_llm_client_shared_across_instances(self):
+        """같은 설정의 서비스 인스턴스는 LLM 클라이언트를 공유"""
+        with patch.dict(os.environ, {"LLM_PROVIDER": "openai", "OPENAI_API_KEY": "sk-test"}):
+            first = TextToSqlService()._get_llm()
+            second = TextToSqlService()._get_llm()
+
+        assert first is second
+
+
+class TestWarmup:
+    """LLM 워밍업 테스트"""
+
+    @pytest.mark.asyncio
+    async def test_warmup_initializes_llm(self):
+        service = _make_service("openai")
+        llm = MagicMock()
+        llm.bind.return_value.ainvoke = AsyncMock()
+        service._llm = llm
+
+        await service.warmup()
+
+        llm.bind.assert_called_once_with(max_tokens=1)
+        llm.bind.return_value.ainvoke.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_warmup_without_api_key_does_not_raise(self):
+        with patch.dict(os.environ, {"LLM_PROVIDER": "openai", "OPENAI_API_KEY": ""}):
+            service = TextToSqlService()
+            await service.warmup()
+
+        assert service._llm is None
@@ -0,0 +1,49 @@
+"""
+TtlLruCache 단위 테스트
+"""
+
+import sys
+import os
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.ttl_cache import TtlLruCache
+
+
+class TestTtlLruCache:
+    """TTL + LRU 캐시 테스트"""
+
+    def test_get_returns_stored_value(self):
+        cache = TtlLruCache(max_entries=2, ttl_seconds=60)
+        cache.set("a", "A")
+        assert cache.get("a") == "A"
+        assert cache.get("missing") is None
+
+    def test_least_recently_used_evicted(self):
+        cache = TtlLruCache(max_entries=2, ttl_seconds=60)
+        cache.set("a", "A")
+        cache.set("b", "B")
+        cache.get("a")          # a를 최근 사용으로 갱신
+        cache.set("c", "C")     # b 제거
+
+        assert cache.get("b") is None
+        assert cache.get("a") == "A"
+        assert cache.get("c") == "C"
+        assert len(cache) == 2
+
+    def test_expired_entry_removed(self):
+        cache = TtlLruCache(max_entries=2, ttl_seconds=10)
+        with patch("app.services.ttl_cache.time.monotonic", return_value=100.0):
+            cache.set("a", "A")
+        with patch("app.services.ttl_cache.time.monotonic", return_value=109.0):
+            assert cache.get("a") == "A"
+        with patch("app.services.ttl_cache.time.monotonic", return_value=110.0):
+            assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_disabled_cache_stores_nothing(self):
+        cache = TtlLruCache(max_entries=0, ttl_seconds=60)
+        cache.set("a", "A")
+        assert cache.get("a") is None
+        assert len(cache) == 0
@@ -205,12 +205,18 @@ class TestExtractWhereConditions:
         """WHERE 절 없음"""
         sql = "SELECT * FROM payments"
         conditions = extract_where_conditions(sql)
-        assert conditions == []
+        assert conditions == ()
 
     def test_empty_sql(self):
         """빈 SQL"""
         conditions = extract_where_conditions("")
-        assert conditions == []
+        assert conditions == ()
+
+    def test_lowercase_where_keyword(self):
+        """소문자 where도 추출됨"""
+        sql = "select * from payments where status = 'DONE'"
+        conditions = extract_where_conditions(sql)
+        assert conditions == ("status = 'DONE'",)
 
     def test_complex_conditions(self):
         """복잡한 조건 (IN, LIKE 등)"""
@@ -220,6 +226,31 @@ class TestExtractWhereConditions:
         conditions = extract_where_conditions(sql)
         assert len(conditions) == 2
 
+    def test_and_inside_string_literal_not_split(self):
+        """문자열 리터럴 안의 AND는 구분자가 아님"""
+        sql = "SELECT * FROM payments WHERE order_name = 'A AND B' AND status = 'DONE'"
+        conditions = extract_where_conditions(sql)
+        assert conditions == ("order_name = 'A AND B'", "status = 'DONE'")
+
+    def test_between_and_not_split(self):
+        """BETWEEN ... AND ... 범위는 하나의 조건으로 유지"""
+        sql = "SELECT * FROM payments WHERE amount BETWEEN 1000 AND 5000 AND status = 'DONE'"
+        conditions = extract_where_conditions(sql)
+        assert conditions == ("amount BETWEEN 1000 AND 5000", "status = 'DONE'")
+
+    def test_and_inside_parentheses_not_split(self):
+        """괄호 안의 AND는 구분자가 아님"""
+        sql = "SELECT * FROM payments WHERE (status = 'DONE' AND amount > 100) AND method = 'CARD'"
+        conditions = extract_where_conditions(sql)
+        assert conditions == ("(status = 'DONE' AND amount > 100)", "method = 'CARD'")
+
+    def test_returns_immutable_cached_tuple(self):
+        """불변 튜플을 반환하므로 캐시된 결과를 그대로 공유"""
+        sql = "SELECT * FROM payments WHERE status = 'DONE'"
+        first = extract_where_conditions(sql)
+        assert isinstance(first, tuple)
+        assert extract_where_conditions(sql) is first
+
 
 class TestExtractConditionField:
     """조건에서 필드명 추출 테스트"""
@@ -313,7 +344,7 @@ class TestConversationContext:
             previous_sql="SELECT * FROM payments",
             previous_result_summary="1000건"
         )
-        assert ctx.accumulated_where_conditions == []
+        assert ctx.accumulated_where_conditions == ()
         assert ctx.is_refinement is False
 
     def test_with_refinement(self):
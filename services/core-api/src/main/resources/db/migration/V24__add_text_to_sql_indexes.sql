@@ -0,0 +1,4 @@
+-- Text-to-SQL 자주 쓰이는 WHERE 패턴용 복합 인덱스
+-- (SCHEMA_PROMPT의 payments 인덱스 힌트와 키 순서를 맞춤)
+CREATE INDEX IF NOT EXISTS idx_payments_status_created ON payments(status, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_payments_aborted_failure_code ON payments(failure_code, created_at DESC) WHERE status = 'ABORTED';